@@ -0,0 +1,115 @@
+"""
+Shared state for the Streamlit app (main.py and the pages/ folder).
+
+Streamlit re-runs a page's whole script on every interaction, so anything
+expensive to build (the model, the rule engine, the PD cache) is created once
+per server process through st.cache_resource and shared by every page and
+session. The form options are plain module constants, built once on import.
+"""
+import os
+import sys
+from pathlib import Path
+
+import pandas as pd
+import streamlit as st
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+sys.path.append(str(PROJECT_ROOT / "src"))
+
+from descision_system import LoanDecisionSystem  # noqa: E402
+from pd_cache import PDCache  # noqa: E402
+from rule_engine import RuleEngine  # noqa: E402
+
+MODEL_PATH = "models/logistic_regression_model.joblib"
+# The app's policy, stricter on PD than the RuleEngine default
+PD_THRESHOLD = 0.12
+
+PURPOSE = {
+    "Debt consolidation": "debt_consolidation",
+    "Car purchase": "car",
+    "Home improvement": "home_improvement",
+    "Personal/other": "personal",
+}
+HOME = {
+    "Renting": "rent",
+    "Own outright": "own",
+    "Mortgage": "mortgage",
+    "Other": "other",
+}
+CHANNEL = {
+    "Online application": "online",
+    "In-branch": "branch",
+}
+REGION = {
+    "North": "north",
+    "East": "east",
+    "South": "south",
+    "West": "west",
+}
+TERM = {
+    "12 months": 12,
+    "24 months": 24,
+    "36 months": 36,
+    "48 months": 48,
+    "60 months": 60,
+}
+
+EMPLOYMENT_LENGTH = {
+    "< 1 year": 0,
+    "1–2 years": 2,
+    "3–5 years": 5,
+    "6–10 years": 10,
+    "11+ years": 11,
+}
+
+
+@st.cache_resource
+def load_pd_cache():
+    # Shared by all sessions, keys include the model version
+    return PDCache(maxsize=1024, ttl=900)
+
+
+@st.cache_resource
+def load_rule_engine():
+    # One engine for every page and session, update_rules swaps its rule set atomically
+    return RuleEngine(pd_threshold=PD_THRESHOLD)
+
+
+@st.cache_resource(max_entries=2)
+def load_system(file_stamp):
+    # Keyed by the model file's mtime and size, so a retrained model is picked up on the next rerun
+    system = LoanDecisionSystem(MODEL_PATH, pd_cache=load_pd_cache())
+    system.rule_engine = load_rule_engine()
+    return system
+
+
+def current_system():
+    """The cached LoanDecisionSystem for the model file as it is now (one stat() per rerun)."""
+    stat = os.stat(MODEL_PATH)
+    return load_system((stat.st_mtime_ns, stat.st_size))
+
+
+def score_frame(system, applicants, chunk_size=10_000, on_progress=None):
+    """Decisions for a DataFrame of applicants, scored chunk by chunk with make_decisions.
+
+    Returns the applicants with Decision, Reasons ("; "-joined) and Predicted_PD columns
+    added. All chunks use the model and rules live when scoring started; the system's
+    metrics and audit log see every chunk. on_progress(rows_done, rows_total) is called
+    after each chunk.
+    """
+    model, rule_set = system.model, system.rule_engine.rule_set
+    n_rows = len(applicants)
+    parts = []
+    for start in range(0, n_rows, chunk_size):
+        parts.append(system.make_decisions(applicants.iloc[start:start + chunk_size], model, rule_set))
+        if on_progress is not None:
+            on_progress(min(start + chunk_size, n_rows), n_rows)
+    if not parts:
+        return applicants.assign(Decision=[], Reasons=[], Predicted_PD=[])
+
+    decisions = pd.concat(parts)
+    result = applicants.copy()
+    result["Decision"] = decisions["Decision"].to_numpy()
+    result["Reasons"] = ["; ".join(reasons) for reasons in decisions["Reasons"]]
+    result["Predicted_PD"] = decisions["Predicted_PD"].to_numpy()
+    return result
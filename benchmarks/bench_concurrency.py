@@ -0,0 +1,72 @@
+"""
+Throughput of one shared LoanDecisionSystem on a thread pool, by thread count.
+
+For each thread count, scores a synthetic batch in chunks with BatchExecutor
+and a stream of single applicants with make_decision, while another thread
+keeps updating the rule thresholds. Reports rows/sec and the speed-up over
+one thread. The speed-up is bounded by the cores available and by the share
+of the work that releases the GIL (NumPy/BLAS), so single decisions on the
+pure-Python fast path scale much less than batches.
+
+Run from the root folder:
+    python3 benchmarks/bench_concurrency.py --threads 1 2 4 8 --rows 200000
+"""
+import argparse
+import sys
+import threading
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT / "src"))
+
+from batch_executor import BatchExecutor  # noqa: E402
+from descision_system import LoanDecisionSystem  # noqa: E402
+from synthetic_data import generate_applicants  # noqa: E402
+
+MODEL_PATH = str(PROJECT_ROOT / "models" / "logistic_regression_model.joblib")
+
+
+def _rule_updates(system, stop):
+    # Flip between two thresholds for the whole run, like an operator tuning the policy
+    flips = 0
+    while not stop.wait(0.005):
+        system.update_rule_parameters(min_credit_score=640 if flips % 2 else 660)
+        flips += 1
+
+
+def bench_threads(system, data, singles, threads, chunk_size):
+    stop = threading.Event()
+    updater = threading.Thread(target=_rule_updates, args=(system, stop), daemon=True)
+    updater.start()
+    try:
+        with BatchExecutor(system, workers=threads, chunk_size=chunk_size) as executor:
+            start = time.perf_counter()
+            executor.make_decisions(data)
+            batch_s = time.perf_counter() - start
+            start = time.perf_counter()
+            executor.map(singles)
+            single_s = time.perf_counter() - start
+    finally:
+        stop.set()
+        updater.join()
+    return len(data) / batch_s, len(singles) / single_s
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Thread scaling of LoanDecisionSystem.")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--singles", type=int, default=20_000)
+    parser.add_argument("--chunk-size", type=int, default=10_000)
+    args = parser.parse_args()
+
+    system = LoanDecisionSystem(MODEL_PATH, fast_path=True)
+    data = generate_applicants(args.rows, with_target=False)
+    singles = data.head(args.singles).to_dict("records")
+    base = None
+    for threads in args.threads:
+        batch_rate, single_rate = bench_threads(system, data, singles, threads, args.chunk_size)
+        base = base or (batch_rate, single_rate)
+        print(f"{threads:3} threads  batch {batch_rate:12,.0f} rows/s ({batch_rate / base[0]:4.2f}x)  "
+              f"single {single_rate:10,.0f} rows/s ({single_rate / base[1]:4.2f}x)")
@@ -0,0 +1,58 @@
+"""
+Microbenchmark for single-applicant make_decision latency.
+
+Compares the old per-call flow (building a DataPreprocessor on every request
+just to read the column lists) with the precomputed FeatureSchema.
+
+Run from the root folder:
+    python3 benchmarks/bench_make_decision.py
+"""
+import sys
+import timeit
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT / "src"))
+
+import pandas as pd  # noqa: E402
+from data_preprocessing import DataPreprocessor  # noqa: E402
+from descision_system import LoanDecisionSystem  # noqa: E402
+
+APPLICANT = {
+    'age': 32, 'annual_income': 60000, 'employment_length': 6, 'credit_score': 690,
+    'debt_to_income': 0.30, 'num_open_accounts': 9, 'delinquencies_2y': 0,
+    'inquiries_6m': 1, 'loan_amount': 12000, 'interest_rate': 0.09,
+    'purpose': 'debt_consol', 'home_ownership': 'rent', 'channel': 'online',
+    'region': 'north', 'loan_term_months': 36,
+}
+
+
+def make_decision_before(system, applicant_data):
+    # The old hot path: a new DataPreprocessor (and ColumnTransformer) per call
+    preprocessor = DataPreprocessor()
+    features = preprocessor.numeric_features + preprocessor.categorical_features
+    df = pd.DataFrame([applicant_data], columns=features)
+    pd_value = system.ml_model.predict_proba(df)[0][1]
+    return system.rule_engine.apply_rules(applicant_data, pd_value)
+
+
+def per_call_us(fn, number):
+    # Best of 5 repeats, in microseconds per call
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e6
+
+
+if __name__ == "__main__":
+    system = LoanDecisionSystem(str(PROJECT_ROOT / "models" / "logistic_regression_model.joblib"))
+    number = 500
+
+    def columns_before():
+        preprocessor = DataPreprocessor()
+        return preprocessor.numeric_features + preprocessor.categorical_features
+
+    schema_only_before = per_call_us(columns_before, number)
+    schema_only_after = per_call_us(lambda: system.feature_schema.columns, number)
+    before = per_call_us(lambda: make_decision_before(system, APPLICANT), number)
+    after = per_call_us(lambda: system.make_decision(APPLICANT), number)
+
+    print(f"column lookup  before: {schema_only_before:8.1f} us/call  after: {schema_only_after:8.2f} us/call")
+    print(f"make_decision  before: {before:8.1f} us/call  after: {after:8.1f} us/call")
@@ -0,0 +1,87 @@
+"""
+Memory and time of the DataPreprocessor output modes on synthetic applicants.
+
+For each row count and mode, fits the preprocessor, transforms the data and
+(with --train) fits the default LogisticRegression on the result. Reports
+wall time, the size of the transformed matrix and the traced peak memory
+of fit_transform (tracemalloc, which NumPy reports its buffers to).
+
+Run from the root folder:
+    python3 benchmarks/bench_preprocessing.py --rows 1000 1000000 --train
+"""
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+import warnings
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT / "src"))
+
+import numpy as np  # noqa: E402
+from scipy import sparse  # noqa: E402
+from data_preprocessing import DECLARED_CATEGORIES, DataPreprocessor  # noqa: E402
+from ml_model_training import MLModelTrainer  # noqa: E402
+from synthetic_data import generate_applicants  # noqa: E402
+
+MODES = {
+    "default": {},
+    "float32-dense": {"dtype": np.float32, "layout": "dense", "categories": DECLARED_CATEGORIES},
+    "float32-csr": {"dtype": np.float32, "layout": "csr", "categories": DECLARED_CATEGORIES},
+}
+
+
+def _nbytes(matrix):
+    if sparse.issparse(matrix):
+        return matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+    return matrix.nbytes
+
+
+def bench_mode(X, y, options, train):
+    gc.collect()
+    start = time.perf_counter()
+    transformed = DataPreprocessor(**options).preprocessor.fit_transform(X)
+    result = {
+        "layout": "csr" if sparse.issparse(transformed) else "dense",
+        "dtype": str(transformed.dtype),
+        "transform_s": time.perf_counter() - start,
+        "output_mb": _nbytes(transformed) / 2**20,
+    }
+    del transformed
+    if train:
+        start = time.perf_counter()
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            MLModelTrainer().train_model(X, y, DataPreprocessor(**options).preprocessor)
+        result["train_s"] = time.perf_counter() - start
+
+    # Separate pass for memory, tracemalloc slows the timed code down a lot
+    gc.collect()
+    tracemalloc.start()
+    transformed = DataPreprocessor(**options).preprocessor.fit_transform(X)
+    result["peak_mb"] = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare DataPreprocessor output modes.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 1_000_000])
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=list(MODES))
+    parser.add_argument("--train", action="store_true", help="also time fitting the model")
+    args = parser.parse_args()
+
+    for n_rows in args.rows:
+        data = generate_applicants(n_rows)
+        X, y = data.drop(columns=["default_12m"]), data["default_12m"]
+        del data
+        print(f"{n_rows:,} rows (input frame {X.memory_usage(deep=True).sum() / 2**20:,.0f} MB)")
+        for mode in args.modes:
+            r = bench_mode(X, y, MODES[mode], args.train)
+            line = (f"  {mode:14} {r['layout']:5} {r['dtype']:7} transform {r['transform_s']:7.3f}s "
+                    f"output {r['output_mb']:8.1f} MB  peak {r['peak_mb']:8.1f} MB")
+            if "train_s" in r:
+                line += f"  train {r['train_s']:7.2f}s"
+            print(line)
@@ -0,0 +1,186 @@
+"""
+Benchmark suite for the scoring and rule paths.
+
+Measures single-call make_decision latency (sklearn and compiled fast
+path), make_decisions throughput, RuleEngine throughput (per-dict
+apply_rules and vectorised evaluate_batch), pipeline load time, cold
+startup (fresh interpreter importing descision_system and loading the
+joblib pipeline or the slim JSON model) and load_and_split_data CSV load
+time, and writes the results as JSON. Given a baseline JSON from an
+earlier run, it exits with status 1 if any metric got worse by more than
+--tolerance.
+
+Run from the root folder:
+    python3 benchmarks/run_benchmarks.py --output bench.json
+    python3 benchmarks/run_benchmarks.py --baseline bench.json --tolerance 0.25
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+import warnings
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT / "src"))
+
+import joblib  # noqa: E402
+import numpy as np  # noqa: E402
+import sklearn  # noqa: E402
+from data_preprocessing import DataPreprocessor  # noqa: E402
+from descision_system import LoanDecisionSystem  # noqa: E402
+from rule_engine import RuleEngine  # noqa: E402
+from synthetic_data import generate_applicants, write_tsv  # noqa: E402
+
+MODEL_PATH = str(PROJECT_ROOT / "models" / "logistic_regression_model.joblib")
+SLIM_MODEL_PATH = str(PROJECT_ROOT / "models" / "logistic_regression_model.json")
+
+
+def _metric(value, unit, better):
+    return {"value": value, "unit": unit, "better": better}
+
+
+def _best_of(fn, repeat=5):
+    # Best wall time over a few repeats, in seconds
+    return min(timeit.repeat(fn, number=1, repeat=repeat))
+
+
+def bench_make_decision(system, applicants, calls, prefix="make_decision"):
+    rows = applicants.drop(columns=["default_12m"]).head(calls).to_dict("records")
+    timings = []
+    for row in rows:
+        start = time.perf_counter()
+        system.make_decision(row)
+        timings.append(time.perf_counter() - start)
+    timings = np.array(timings) * 1e6
+    return {
+        f"{prefix}_p50": _metric(float(np.percentile(timings, 50)), "us", "lower"),
+        f"{prefix}_p99": _metric(float(np.percentile(timings, 99)), "us", "lower"),
+    }
+
+
+def bench_make_decisions(system, applicants):
+    seconds = _best_of(lambda: system.make_decisions(applicants), repeat=3)
+    return {"make_decisions_throughput": _metric(len(applicants) / seconds, "rows/s", "higher")}
+
+
+def bench_rules(applicants, loop_rows):
+    engine = RuleEngine()
+    pds = np.random.default_rng(0).uniform(0, 0.3, len(applicants))
+    rows = applicants.head(loop_rows).to_dict("records")
+    loop_seconds = _best_of(lambda: [engine.apply_rules(row, p) for row, p in zip(rows, pds)], repeat=3)
+    batch_seconds = _best_of(lambda: engine.evaluate_batch(applicants, pds))
+    return {
+        "apply_rules_throughput": _metric(len(rows) / loop_seconds, "rows/s", "higher"),
+        "evaluate_batch_throughput": _metric(len(applicants) / batch_seconds, "rows/s", "higher"),
+    }
+
+
+def bench_pipeline_load():
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        seconds = _best_of(lambda: joblib.load(MODEL_PATH))
+    return {"pipeline_load": _metric(seconds * 1e3, "ms", "lower")}
+
+
+def _startup_seconds(model_path):
+    # A fresh interpreter each time, so imports are not already cached in sys.modules
+    code = (f"import sys; sys.path.insert(0, {str(PROJECT_ROOT / 'src')!r}); "
+            f"from descision_system import LoanDecisionSystem; LoanDecisionSystem({model_path!r}); "
+            "sys.exit('sklearn' in sys.modules)")
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-W", "ignore", "-c", code])
+    return time.perf_counter() - start, bool(result.returncode)
+
+
+def bench_startup(repeat=3):
+    results = {}
+    for name, path in [("startup_pipeline", MODEL_PATH), ("startup_slim", SLIM_MODEL_PATH)]:
+        runs = [_startup_seconds(path) for _ in range(repeat)]
+        results[name] = _metric(min(seconds for seconds, _ in runs) * 1e3, "ms", "lower")
+        if name == "startup_slim" and runs[0][1]:
+            print("WARNING: loading the slim model imported sklearn", file=sys.stderr)
+    return results
+
+
+def bench_csv_load(csv_rows):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_tsv(Path(tmp) / "applications.csv", csv_rows)
+        dp = DataPreprocessor()
+        seconds = _best_of(lambda: dp.load_and_split_data(path), repeat=3)
+    return {"load_and_split_data": _metric(seconds * 1e3, "ms", "lower")}
+
+
+def run(batch_rows, calls, loop_rows, csv_rows):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        system = LoanDecisionSystem(MODEL_PATH)
+        fast_system = LoanDecisionSystem(MODEL_PATH, fast_path=True)
+    applicants = generate_applicants(batch_rows)
+
+    results = {}
+    results.update(bench_make_decision(system, applicants, calls))
+    results.update(bench_make_decision(fast_system, applicants, calls, prefix="make_decision_fast_path"))
+    results.update(bench_make_decisions(system, applicants))
+    results.update(bench_rules(applicants, loop_rows))
+    results.update(bench_pipeline_load())
+    results.update(bench_startup())
+    results.update(bench_csv_load(csv_rows))
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "sklearn": sklearn.__version__,
+            "batch_rows": batch_rows,
+            "calls": calls,
+            "csv_rows": csv_rows,
+        },
+        "results": results,
+    }
+
+
+def find_regressions(current, baseline, tolerance):
+    """Metrics that got worse than baseline by more than tolerance (0.2 = 20%)."""
+    regressions = []
+    for name, old in baseline["results"].items():
+        new = current["results"].get(name)
+        if new is None:
+            continue
+        if old["better"] == "lower":
+            worse = new["value"] > old["value"] * (1 + tolerance)
+        else:
+            worse = new["value"] < old["value"] / (1 + tolerance)
+        if worse:
+            regressions.append(f"{name}: {old['value']:.4g} -> {new['value']:.4g} {new['unit']}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the loan decision scoring and rule paths.")
+    parser.add_argument("--batch-rows", type=int, default=100_000, help="applicants per batch benchmark")
+    parser.add_argument("--calls", type=int, default=1_000, help="single make_decision calls to time")
+    parser.add_argument("--loop-rows", type=int, default=100_000, help="applicants for the apply_rules loop")
+    parser.add_argument("--csv-rows", type=int, default=100_000, help="rows in the synthetic TSV")
+    parser.add_argument("--output", help="write results JSON here (default: stdout)")
+    parser.add_argument("--baseline", help="results JSON from an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown before failing")
+    args = parser.parse_args()
+
+    current = run(args.batch_rows, args.calls, args.loop_rows, args.csv_rows)
+    report = json.dumps(current, indent=2)
+    if args.output:
+        Path(args.output).write_text(report)
+    else:
+        print(report)
+
+    if args.baseline:
+        regressions = find_regressions(current, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        for line in regressions:
+            print("REGRESSION", line, file=sys.stderr)
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,54 @@
+"""
+Synthetic loan applications in the data/loan_applications.csv layout.
+
+Values are drawn vectorised from the same ranges as the sample data, with
+the categories of data_preprocessing.DECLARED_CATEGORIES, so millions of
+rows take a few seconds.
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+from data_preprocessing import DECLARED_CATEGORIES  # noqa: E402
+
+
+def generate_applicants(n_rows, seed=0, with_target=True):
+    """DataFrame of n_rows applicants with every DataPreprocessor column (plus default_12m)."""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "age": rng.integers(18, 80, n_rows),
+        "annual_income": rng.integers(10_000, 150_000, n_rows),
+        "employment_length": rng.integers(0, 41, n_rows),
+        "credit_score": rng.integers(550, 851, n_rows),
+        "debt_to_income": rng.uniform(0.05, 0.6, n_rows).round(2),
+        "num_open_accounts": rng.integers(1, 21, n_rows),
+        "delinquencies_2y": rng.integers(0, 4, n_rows),
+        "inquiries_6m": rng.integers(0, 5, n_rows),
+        "loan_amount": rng.integers(2_000, 50_000, n_rows),
+        "interest_rate": rng.uniform(0.03, 0.2, n_rows).round(2),
+        "purpose": rng.choice(DECLARED_CATEGORIES["purpose"], n_rows),
+        "home_ownership": rng.choice(DECLARED_CATEGORIES["home_ownership"], n_rows),
+        "channel": rng.choice(DECLARED_CATEGORIES["channel"], n_rows),
+        "region": rng.choice(DECLARED_CATEGORIES["region"], n_rows),
+        "loan_term_months": rng.choice(DECLARED_CATEGORIES["loan_term_months"], n_rows),
+    })
+    if with_target:
+        df["default_12m"] = rng.integers(0, 2, n_rows)
+    return df
+
+
+def write_tsv(filepath, n_rows, seed=0, chunk_rows=500_000, with_target=True):
+    """Writes n_rows synthetic applicants as a TSV, chunk by chunk so memory stays flat."""
+    written = 0
+    chunk = 0
+    while written < n_rows:
+        rows = min(chunk_rows, n_rows - written)
+        df = generate_applicants(rows, seed=seed + chunk, with_target=with_target)
+        df.to_csv(filepath, sep="\t", index=False, mode="w" if chunk == 0 else "a", header=chunk == 0)
+        written += rows
+        chunk += 1
+    return filepath
@@ -1,58 +1,15 @@
 import streamlit as st
-import pandas as pd
-import joblib
-from src.rule_engine import RuleEngine
+from app_resources import CHANNEL, EMPLOYMENT_LENGTH, HOME, PURPOSE, REGION, TERM, current_system
 
 st.set_page_config(page_title="Loan Decision", layout="centered")
 
-@st.cache_resource
-def load_pipeline():
-    return joblib.load("models/logistic_regression_model.joblib")
-
-pipeline = load_pipeline()
-engine = RuleEngine(pd_threshold=0.12) 
-
-
-PURPOSE = {
-    "Debt consolidation": "debt_consolidation",
-    "Car purchase": "car",
-    "Home improvement": "home_improvement",
-    "Personal/other": "personal",
-}
-HOME = {
-    "Renting": "rent",
-    "Own outright": "own",
-    "Mortgage": "mortgage",
-    "Other": "other",
-}
-CHANNEL = {
-    "Online application": "online",
-    "In-branch": "branch",
-}
-REGION = {
-    "North": "north",
-    "East": "east",
-    "South": "south",
-    "West": "west",
-}
-TERM = {
-    "12 months": 12,
-    "24 months": 24,
-    "36 months": 36,
-    "48 months": 48,
-    "60 months": 60,
-}
-
-EMPLOYMENT_LENGTH = {
-    "< 1 year": 0,
-    "1–2 years": 2,
-    "3–5 years": 5,
-    "6–10 years": 10,
-    "11+ years": 11,
-}
+# Model, rule engine and PD cache are built once per server and shared by every rerun and page
+system = current_system()
+pd_cache = system.pd_cache
 
 st.title("Loan Decision System")
 st.subheader("Fill in the applicant details to get a loan decision, based on predicted probability of default (PD) and business rules.")
+st.caption("To score a whole file of applications, use the Batch Scoring page.")
 
 with st.form("applicant"):
     col1, col2 = st.columns(2)
@@ -99,13 +56,15 @@ if submitted:
         "interest_rate": interest_percent / 100.0,  
     }
 
-    df = pd.DataFrame([applicant])
-    pd_value = float(pipeline.predict_proba(df)[:, 1][0])
-    result = engine.apply_rules(applicant, pd_value)
+    # Resubmitting the same form reuses the PD, rules are still applied fresh
+    result = system.make_decision(applicant)
+    pd_value = float(result["Predicted_PD"])
 
     st.metric("Predicted PD", f"{pd_value:.2%}")
     st.subheader(f"Decision: {result['Decision']}")
     st.write("Reasons:")
     for r in result["Reasons"]:
         st.write(f"- {r}")
+    stats = pd_cache.stats()
+    st.caption(f"PD cache: {stats['hits']} hits, {stats['misses']} misses, {stats['evictions']} evictions")
 
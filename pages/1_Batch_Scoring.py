@@ -0,0 +1,64 @@
+import hashlib
+import io
+
+import pandas as pd
+import streamlit as st
+from app_resources import current_system, score_frame
+
+st.set_page_config(page_title="Batch Scoring", layout="wide")
+
+# Rows shown in the browser, the download has all of them
+PREVIEW_ROWS = 1_000
+
+system = current_system()
+
+st.title("Batch Scoring")
+st.subheader("Upload a file of applications (same columns as data/loan_applications.csv) to score them all at once.")
+
+uploaded = st.file_uploader("Applications file", type=["tsv", "csv", "txt"])
+separator = st.radio("Column separator", ["Tab", "Comma"], horizontal=True)
+
+if uploaded is not None:
+    data = uploaded.getvalue()
+    sep = "\t" if separator == "Tab" else ","
+    # Reruns (e.g. clicking download) reuse the result until the file, model or rules change
+    key = (hashlib.sha256(data).hexdigest(), sep, system.model_version, system.rule_engine.version)
+    if st.session_state.get("batch_key") != key:
+        progress = st.progress(0.0, text="Scoring...")
+        try:
+            applicants = pd.read_csv(io.BytesIO(data), sep=sep)
+            results = score_frame(system, applicants, on_progress=lambda done, total: progress.progress(
+                done / total, text=f"Scored {done:,} of {total:,} applications"))
+        except KeyError as e:
+            progress.empty()
+            st.error(f"The file is missing columns the model needs: {e}")
+            st.stop()
+        except pd.errors.EmptyDataError:
+            progress.empty()
+            st.error("The file is empty.")
+            st.stop()
+        except (ValueError, pd.errors.ParserError) as e:
+            # ParserError is a ValueError too: usually the wrong separator, or text in a number column
+            progress.empty()
+            st.error(f"Could not read the file as {separator.lower()}-separated applications: {e}")
+            st.stop()
+        progress.empty()
+        st.session_state["batch_key"] = key
+        st.session_state["batch_results"] = results
+        st.session_state["batch_file"] = results.to_csv(sep="\t", index=False).encode()
+    results = st.session_state["batch_results"]
+
+    approved = int((results["Decision"] == "Approved").sum())
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Applications", f"{len(results):,}")
+    col2.metric("Approved", f"{approved:,}", f"{approved / max(len(results), 1):.1%}", delta_color="off")
+    col3.metric("Mean predicted PD", f"{results['Predicted_PD'].mean():.2%}")
+
+    st.write("Reasons given:")
+    reasons = results["Reasons"].str.split("; ").explode().value_counts()
+    st.bar_chart(reasons)
+
+    st.download_button("Download decisions (TSV)", st.session_state["batch_file"],
+                       file_name=f"decisions_{uploaded.name.rsplit('.', 1)[0]}.tsv", mime="text/tab-separated-values")
+    st.caption(f"First {min(PREVIEW_ROWS, len(results)):,} rows:")
+    st.dataframe(results.head(PREVIEW_ROWS))
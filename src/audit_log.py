@@ -0,0 +1,385 @@
+"""
+Append-only audit trail of lending decisions.
+
+Every decision is written as one JSON line: time, applicant id, model and
+rule-set versions, PD, decision, reasons and the applicant's inputs. The
+scoring thread only puts a tuple on a queue; a background writer turns
+queued decisions into lines, writes them in batches and fsyncs on a
+schedule (every fsync_interval seconds, on flush() and on stop()).
+
+The queue is bounded. When it is full, record() waits for the writer to
+catch up (on_full="block", the default, so nothing is lost) or drops the
+record and counts it (on_full="drop").
+
+The log is split into segments (audit-00000001.jsonl, ...) of about
+segment_bytes each. For each segment the writer keeps the byte offsets of
+every applicant id and the segment's time range, saved next to it as
+audit-00000001.idx.json when the segment is closed, so find() reads only
+the lines for one applicant and between() only the segments in range.
+"""
+import json
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+
+_STOP = object()
+
+
+def _jsonable(value):
+    # numpy scalars and anything else json doesn't know
+    return value.item() if hasattr(value, "item") else str(value)
+
+
+# One encoder for every line, json.dumps with options builds a new one per call
+_ENCODER = json.JSONEncoder(separators=(",", ":"), default=_jsonable)
+
+
+def _rows(frame):
+    # Row dicts of plain Python values, several times faster than to_dict("records")
+    names = frame.columns.tolist()
+    columns = [frame[name].tolist() for name in names]
+    return [dict(zip(names, values)) for values in zip(*columns)]
+
+
+class AuditLog:
+    """Segmented JSONL decision log with a bounded queue and a batching background writer.
+
+    id_field is the input column find() looks applicants up by. data/loan_applications.csv
+    has no applicant_id column, so set it to your id column (entries without one are only
+    found by between()).
+    """
+
+    def __init__(self, directory, id_field="applicant_id", segment_bytes=64 << 20, max_queue=10_000,
+                 fsync_interval=1.0, batch_size=1_000, on_full="block"):
+        if on_full not in ("block", "drop"):
+            raise ValueError("on_full must be 'block' or 'drop'")
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.id_field = id_field
+        self.segment_bytes = segment_bytes
+        self.max_queue = max_queue
+        self.fsync_interval = fsync_interval
+        self.batch_size = batch_size
+        self.on_full = on_full
+        self.written = 0
+        self.dropped = 0
+        self.fsyncs = 0
+        # Records the writer could not encode or write, and the last error, reported by flush()
+        self.failed = 0
+        self.error = None
+        # SimpleQueue is a C queue, several times cheaper per put than queue.Queue; bounded via qsize()
+        self._queue = queue.SimpleQueue()
+        self._drained = threading.Event()
+        self._index_lock = threading.Lock()
+        # segment number -> {"size", "first_ts", "last_ts", "ids": {applicant id: [[offset, length], ...]}}
+        self._segments = {}
+        self._thread = None
+        self._file = None
+        self._load_index()
+
+    def _segment_path(self, number):
+        return self.directory / f"audit-{number:08d}.jsonl"
+
+    def _index_path(self, number):
+        return self.directory / f"audit-{number:08d}.idx.json"
+
+    def _load_index(self):
+        for path in sorted(self.directory.glob("audit-*.jsonl")):
+            number = int(path.stem.split("-")[1])
+            size = path.stat().st_size
+            index = None
+            if self._index_path(number).exists():
+                index = json.loads(self._index_path(number).read_text())
+            if index is None or index["size"] != size:
+                index = self._scan_segment(path)
+            self._segments[number] = index
+        if not self._segments:
+            self._segments[1] = {"size": 0, "first_ts": None, "last_ts": None, "ids": {}}
+
+    def _scan_segment(self, path):
+        """Rebuilds a segment's index from its lines, cutting off a line torn by a crash."""
+        index = {"size": 0, "first_ts": None, "last_ts": None, "ids": {}}
+        with open(path, "rb+") as f:
+            offset = 0
+            for line in f:
+                if not line.endswith(b"\n"):
+                    f.truncate(offset)
+                    break
+                entry = json.loads(line)
+                self._add_to_index(index, entry["id"], entry["ts"], offset, len(line))
+                offset += len(line)
+        index["size"] = offset
+        return index
+
+    @staticmethod
+    def _add_to_index(index, applicant_id, ts, offset, length):
+        if applicant_id is not None:
+            index["ids"].setdefault(str(applicant_id), []).append([offset, length])
+        if index["first_ts"] is None:
+            index["first_ts"] = ts
+        index["first_ts"] = min(index["first_ts"], ts)
+        index["last_ts"] = ts if index["last_ts"] is None else max(index["last_ts"], ts)
+        index["size"] = offset + length
+
+    # Scoring side
+
+    def _wait_for_space(self):
+        """Backpressure when the queue is full. Returns False if the record should be dropped."""
+        while self._queue.qsize() >= self.max_queue:
+            if self.on_full == "drop":
+                self.dropped += 1
+                return False
+            if self._thread is None or not self._thread.is_alive():
+                raise RuntimeError("Audit log writer is not running, the queue will not drain")
+            self._drained.clear()
+            self._drained.wait(0.05)
+        return True
+
+    def record(self, applicant, result, model_version, rule_set_version):
+        """Queues one decision (an apply_rules result) for writing. Cheap: no serialising or I/O here."""
+        if self._queue.qsize() >= self.max_queue and not self._wait_for_space():
+            return
+        # Copy the inputs and snapshot the result, the caller may reuse or change either dict
+        decision = (result["Decision"], tuple(result["Reasons"]), float(result["Predicted_PD"]))
+        self._queue.put((time.time(), dict(applicant), decision, model_version, rule_set_version))
+
+    def record_batch(self, applicants, results, model_version, rule_set_version):
+        """Queues a whole batch as one item: applicants DataFrame and the make_decisions results frame."""
+        if self._queue.qsize() >= self.max_queue and not self._wait_for_space():
+            return
+        # Snapshot both frames (columnar copies, reasons as tuples): the caller may change them
+        # before the writer gets to them, and the log must show what was actually decided
+        decisions = results[["Decision", "Predicted_PD"]].copy()
+        decisions["Reasons"] = [tuple(reasons) for reasons in results["Reasons"]]
+        self._queue.put((time.time(), applicants.copy(), decisions, model_version, rule_set_version))
+
+    # Writer side
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return self
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+        return self
+
+    def flush(self, timeout=None):
+        """Waits until everything queued so far is written and fsynced.
+
+        Raises RuntimeError if the writer is not running, or if records failed to
+        encode or write since the last flush (they are counted in failed).
+        """
+        if self._thread is None or not self._thread.is_alive():
+            raise RuntimeError("Audit log writer is not running, call start()")
+        done = threading.Event()
+        self._queue.put(done)
+        flushed = done.wait(timeout)
+        error, self.error = self.error, None
+        if error is not None:
+            raise RuntimeError(f"Audit log writer failed, {self.failed} records not logged so far") from error
+        return flushed
+
+    def stop(self):
+        """Writes and fsyncs what is queued, saves the index and stops the writer."""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+
+    def _lines(self, item):
+        """(applicant id, ts, JSON line) for each decision in a queued item."""
+        ts, applicants, results, model_version, rule_set_version = item
+        if isinstance(applicants, dict):
+            rows = [(applicants, *results)]
+        else:
+            rows = zip(_rows(applicants), results["Decision"].tolist(), results["Reasons"].tolist(),
+                       results["Predicted_PD"].tolist())
+        for applicant, decision, reasons, pd_value in rows:
+            applicant_id = applicant.get(self.id_field)
+            line = _ENCODER.encode({
+                "ts": ts, "id": applicant_id, "model": model_version, "rules": rule_set_version,
+                "pd": float(pd_value), "decision": decision, "reasons": list(reasons), "input": applicant,
+            })
+            yield applicant_id, ts, (line + "\n").encode()
+
+    def _open_segment(self):
+        number = max(self._segments)
+        if self._segments[number]["size"] >= self.segment_bytes:
+            self._close_segment()
+            number += 1
+            with self._index_lock:
+                self._segments[number] = {"size": 0, "first_ts": None, "last_ts": None, "ids": {}}
+        if self._file is None:
+            self._file = open(self._segment_path(number), "ab")
+        return number
+
+    def _close_segment(self):
+        if self._file is None:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.fsyncs += 1
+        self._file.close()
+        self._file = None
+        number = max(self._segments)
+        with self._index_lock:
+            index = json.dumps(self._segments[number])
+        tmp = self._index_path(number).with_suffix(".tmp")
+        tmp.write_text(index)
+        os.replace(tmp, self._index_path(number))
+
+    @staticmethod
+    def _count(item):
+        # Decisions in a queued item: one for record(), a row each for record_batch()
+        return 1 if isinstance(item[1], dict) else len(item[1])
+
+    def _failure(self, error, count):
+        self.error = error
+        self.failed += count
+        print(f"Audit log: {count} records not logged: {error!r}")
+
+    def _write(self, items):
+        entries = []
+        for item in items:
+            try:
+                entries += self._lines(item)
+            except Exception as e:
+                # A bad item (e.g. a result without Predicted_PD) only loses itself
+                self._failure(e, self._count(item))
+        if not entries:
+            return
+        number = self._open_segment()
+        segment = self._segments[number]
+        try:
+            self._file.write(b"".join(line for _, _, line in entries))
+            # To the OS (not yet fsynced) before the index points at it, so lookups can read it
+            self._file.flush()
+        except OSError:
+            # E.g. disk full: cut off whatever part made it, the next batch reopens the segment
+            file, self._file = self._file, None
+            try:
+                file.close()
+            except OSError:
+                pass
+            try:
+                os.truncate(self._segment_path(number), segment["size"])
+            except OSError:
+                pass
+            raise
+        offset = segment["size"]
+        with self._index_lock:
+            for applicant_id, ts, line in entries:
+                self._add_to_index(segment, applicant_id, ts, offset, len(line))
+                offset += len(line)
+        self.written += len(entries)
+
+    def _run(self):
+        last_sync = time.monotonic()
+        dirty = False
+        while True:
+            try:
+                batch = [self._queue.get(timeout=self.fsync_interval)]
+            except queue.Empty:
+                batch = []
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._drained.set()
+            stop = _STOP in batch
+            flushes = [item for item in batch if isinstance(item, threading.Event)]
+            items = [item for item in batch if isinstance(item, tuple)]
+            written, failed = self.written, self.failed
+            try:
+                if items:
+                    self._write(items)
+                    dirty = self._file is not None
+                if dirty and (flushes or stop or time.monotonic() - last_sync >= self.fsync_interval):
+                    self._file.flush()
+                    os.fsync(self._file.fileno())
+                    self.fsyncs += 1
+                    last_sync = time.monotonic()
+                    dirty = False
+                if stop:
+                    self._close_segment()
+            except Exception as e:
+                # Keep the writer alive, flush() reports it. Only count the records _write
+                # didn't already count as written or failed
+                accounted = (self.written - written) + (self.failed - failed)
+                self._failure(e, sum(self._count(item) for item in items) - accounted)
+            for done in flushes:
+                done.set()
+            if stop:
+                return
+
+    # Lookups
+
+    def _read(self, number, locations):
+        with open(self._segment_path(number), "rb") as f:
+            for offset, length in locations:
+                f.seek(offset)
+                yield json.loads(f.read(length))
+
+    def find(self, applicant_id, start=None, end=None):
+        """Every logged decision for one applicant (optionally within [start, end] epoch seconds), oldest first.
+
+        Only covers what the writer has written; call flush() first to include everything queued.
+        """
+        with self._index_lock:
+            locations = {number: list(index["ids"].get(str(applicant_id), ()))
+                         for number, index in self._segments.items()}
+        entries = []
+        for number, segment_locations in sorted(locations.items()):
+            entries += [entry for entry in self._read(number, segment_locations)
+                        if (start is None or entry["ts"] >= start) and (end is None or entry["ts"] <= end)]
+        return entries
+
+    def between(self, start, end):
+        """Every logged decision with start <= ts <= end, reading only the segments that overlap."""
+        with self._index_lock:
+            ranges = [(number, index["first_ts"], index["last_ts"], index["size"])
+                      for number, index in sorted(self._segments.items())]
+        entries = []
+        for number, first_ts, last_ts, size in ranges:
+            if first_ts is None or last_ts < start or first_ts > end:
+                continue
+            with open(self._segment_path(number), "rb") as f:
+                for line in f.read(size).splitlines():
+                    entry = json.loads(line)
+                    if start <= entry["ts"] <= end:
+                        entries.append(entry)
+        return entries
+
+
+if __name__ == "__main__":
+    import statistics
+    import tempfile
+    import pandas as pd
+    from descision_system import LoanDecisionSystem
+
+    # make_decision time without and with the audit log. Each run waits for the writer
+    # (flush), so its serialising and fsyncs count too, even on a single core.
+    applicants = pd.read_csv("data/loan_applications.csv", sep="\t").drop(columns=["default_12m"])
+    applicants = applicants.to_dict("records")
+    with tempfile.TemporaryDirectory() as directory:
+        audit = AuditLog(directory).start()
+        for fast_path in (False, True):
+            timings = {}
+            for name, log in (("without audit", None), ("with audit", audit)):
+                system = LoanDecisionSystem("models/logistic_regression_model.joblib", fast_path=fast_path,
+                                            audit_log=log)
+                runs = []
+                for _ in range(5):
+                    start = time.perf_counter()
+                    for applicant in applicants:
+                        system.make_decision(applicant)
+                    if log is not None:
+                        log.flush()
+                    runs.append((time.perf_counter() - start) / len(applicants))
+                timings[name] = statistics.median(runs)
+            overhead = timings["with audit"] / timings["without audit"] - 1
+            print(f"{'fast path' if fast_path else 'sklearn'}: {timings['without audit'] * 1e6:.1f} us -> "
+                  f"{timings['with audit'] * 1e6:.1f} us per decision ({overhead:+.1%})")
+        audit.stop()
+        print(f"{audit.written} records written, {audit.fsyncs} fsyncs")
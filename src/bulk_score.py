@@ -0,0 +1,164 @@
+"""
+Bulk scoring CLI for TSV files in the data/loan_applications.csv layout.
+
+The input is cut into byte ranges on line boundaries. Each worker process
+loads the model once, then parses and scores whole ranges, so parsing is
+spread over the pool as well as scoring. Decisions are written to the output
+TSV in input order as chunks complete.
+
+With --shared-model DIR the parent publishes the compiled model once as a
+memory-mapped segment (shared_model.py) and every worker maps it read-only
+instead of unpickling its own copy of the pipeline.
+
+Run from the root folder:
+    python3 src/bulk_score.py applications.tsv decisions.tsv --workers 8
+"""
+import argparse
+import io
+import os
+import sys
+import time
+from multiprocessing import Pool
+
+import numpy as np
+import pandas as pd
+
+from compiled_scorer import CompiledScorer
+from descision_system import LoanDecisionSystem
+from shared_model import publish
+
+# Set per worker process by _init_worker
+_system = None
+
+
+def split_ranges(filepath, chunk_bytes):
+    """Header line plus (start, end) byte ranges that each end on a line boundary."""
+    size = os.path.getsize(filepath)
+    with open(filepath, "rb") as f:
+        header = f.readline()
+        ranges = []
+        start = f.tell()
+        while start < size:
+            f.seek(min(start + chunk_bytes, size))
+            # Finish the line the seek landed in
+            f.readline()
+            end = f.tell()
+            ranges.append((start, end))
+            start = end
+    return header, ranges
+
+
+def _init_worker(model_path, fast_path, rule_params):
+    global _system
+    _system = LoanDecisionSystem(model_path, fast_path=fast_path)
+    if rule_params:
+        _system.update_rule_parameters(**rule_params)
+
+
+def _score_range(task):
+    """Parses and scores one byte range, returns (rows, decisions as TSV text without header)."""
+    filepath, header, start, end, id_column = task
+    # Pick up a newly published shared model between chunks (no-op for a joblib model)
+    _system.refresh_shared_model()
+    with open(filepath, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    df = pd.read_csv(io.BytesIO(header + data), sep="\t")
+    try:
+        features, pd_values = _system.predict_pds(df)
+    except KeyError as e:
+        raise ValueError(f"Rows in bytes {start}-{end} are missing columns: {e}") from None
+    rules = _system.rule_engine.rule_set
+    masks = rules.evaluate_batch(features, pd_values)
+    # Decode each distinct reason mask once rather than building a list per row
+    unique_masks, inverse = np.unique(masks, return_inverse=True)
+    reasons = np.array(["; ".join(rules.decode(mask)) for mask in unique_masks], dtype=object)
+
+    out = pd.DataFrame({
+        "Decision": np.where(masks != 0, "Rejected", "Approved"),
+        "Reasons": reasons[inverse],
+        "Predicted_PD": pd_values,
+    })
+    if id_column is not None:
+        out.insert(0, id_column, df[id_column])
+    # Format in the worker so the parent only has to write bytes in order
+    return len(out), out.to_csv(sep="\t", index=False, header=False)
+
+
+def score_file(input_path, output_path, model_path="models/logistic_regression_model.joblib", workers=None,
+               chunk_bytes=8 << 20, fast_path=True, rule_params=None, id_column=None):
+    """Scores every row of input_path into output_path, returns (rows, seconds).
+
+    output_path is only written (replaced) when every row scored; on an error it is left as it was.
+    """
+    start_time = time.perf_counter()
+    header, ranges = split_ranges(input_path, chunk_bytes)
+    tasks = [(input_path, header, start, end, id_column) for start, end in ranges]
+    workers = workers or os.cpu_count()
+
+    rows = 0
+    pool = None
+    # Written next to the output and renamed over it only when every chunk scored,
+    # so a failed run never leaves a partial file that looks complete
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w", newline="") as out:
+            if workers == 1:
+                # Same code path without the pool, easier to debug
+                _init_worker(model_path, fast_path, rule_params)
+                results = map(_score_range, tasks)
+            else:
+                pool = Pool(workers, initializer=_init_worker, initargs=(model_path, fast_path, rule_params))
+                # imap hands results back in task order, so the output follows the input
+                results = pool.imap(_score_range, tasks)
+            columns = ([id_column] if id_column is not None else []) + ["Decision", "Reasons", "Predicted_PD"]
+            out.write("\t".join(columns) + "\n")
+            for chunk_rows, text in results:
+                out.write(text)
+                rows += chunk_rows
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        # Don't wait for the remaining chunks
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+            pool = None
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    return rows, time.perf_counter() - start_time
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score a TSV of loan applications in parallel.")
+    parser.add_argument("input", help="TSV in the data/loan_applications.csv layout")
+    parser.add_argument("output", help="where to write the decisions TSV")
+    parser.add_argument("--model", default="models/logistic_regression_model.joblib")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--chunk-mb", type=float, default=8, help="input megabytes per chunk")
+    parser.add_argument("--pd-threshold", type=float, default=None, help="override the PD threshold rule")
+    parser.add_argument("--id-column", default=None, help="input column to copy into the output")
+    parser.add_argument("--no-fast-path", action="store_true", help="score with the sklearn pipeline")
+    parser.add_argument("--shared-model", default=None, metavar="DIR",
+                        help="publish the model to DIR as a shared segment and have workers map it")
+    args = parser.parse_args()
+
+    model_path = args.model
+    if args.shared_model:
+        import joblib
+        publish(CompiledScorer.from_pipeline(joblib.load(args.model)), args.shared_model)
+        model_path = args.shared_model
+
+    rule_params = {"pd_threshold": args.pd_threshold} if args.pd_threshold is not None else None
+    try:
+        rows, seconds = score_file(args.input, args.output, model_path, args.workers, int(args.chunk_mb * (1 << 20)),
+                                   fast_path=not args.no_fast_path, rule_params=rule_params,
+                                   id_column=args.id_column)
+    except (FileNotFoundError, ValueError) as e:
+        print("Error:", e)
+        sys.exit(1)
+    print(f"Scored {rows} rows in {seconds:.2f}s ({rows / seconds:,.0f} rows/sec)")
@@ -1,13 +1,70 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
 import pandas as pd
+from pandas.api.types import union_categoricals
 from sklearn.model_selection import train_test_split
 from sklearn.compose import ColumnTransformer
-from sklearn.preprocessing import StandardScaler, OneHotEncoder
+from sklearn.preprocessing import StandardScaler, OneHotEncoder, FunctionTransformer
 from sklearn.pipeline import Pipeline
 import joblib
 
+# Compact dtypes for streamed reads, sized for the ranges in the application extracts
+COMPACT_DTYPES = {
+    "age": "int8",
+    "annual_income": "int32",
+    "employment_length": "int8",
+    "credit_score": "int16",
+    "debt_to_income": "float32",
+    "num_open_accounts": "int16",
+    "delinquencies_2y": "int8",
+    "inquiries_6m": "int8",
+    "loan_amount": "int32",
+    "interest_rate": "float32",
+    "purpose": "category",
+    "home_ownership": "category",
+    "channel": "category",
+    "region": "category",
+    "loan_term_months": "int16",
+    "default_12m": "int8",
+}
+
+# Full vocabulary of each categorical column, for one-hot encoders fixed up front (categories=...)
+DECLARED_CATEGORIES = {
+    "purpose": ["car", "debt_consol", "education", "home_improv", "medical", "vacation"],
+    "home_ownership": ["mortgage", "own", "rent"],
+    "channel": ["agent", "branch", "online"],
+    "region": ["east", "north", "south", "west"],
+    "loan_term_months": [12, 24, 36, 48, 60],
+}
+
+class MissingColumnsError(ValueError):
+    """A streamed chunk lacks columns the preprocessor needs."""
+
+
+# Output layouts for DataPreprocessor(layout=...), as ColumnTransformer sparse_threshold values
+_LAYOUTS = {"dense": 0.0, "csr": 1.0}
+
 class DataPreprocessor:
   # Default within 12 months y/n
-    def __init__(self, target_col="default_12m"):
+    def __init__(self, target_col="default_12m", dtype=None, layout=None, categories=None):
+        """Preprocessing options, all defaulting to plain sklearn behaviour:
+        - dtype: output dtype, e.g. np.float32 to halve the memory of big training sets
+        - layout: "dense" or "csr" to fix the output layout (default: ColumnTransformer decides)
+        - categories: {column: values} to fix the one-hot vocabulary (e.g. DECLARED_CATEGORIES)
+          instead of learning it in fit; values outside it encode as all zeros
+        """
+        if layout is not None and layout not in _LAYOUTS:
+            raise ValueError(f"layout must be one of {sorted(_LAYOUTS)}, got {layout!r}")
+        self.dtype = dtype
+        self.layout = layout
+        self.categories = categories
         # Column name want to predict (e.g., if a loan will default)
         self.target_col = target_col
         # Ficticious categories
@@ -21,22 +78,48 @@ class DataPreprocessor:
 
     def _build_preprocessor(self):
         """Builds column transformer for preprocessing happenings"""
+        scaler = StandardScaler()
+        encoder_options = {}
+        if self.dtype is not None:
+            # Cast before scaling, StandardScaler keeps float32 input as float32
+            scaler = Pipeline([
+                ("cast", FunctionTransformer(np.asarray, kw_args={"dtype": self.dtype})),
+                ("scale", scaler),
+            ])
+            encoder_options["dtype"] = self.dtype
+        if self.layout is not None:
+            encoder_options["sparse_output"] = self.layout == "csr"
+        if self.categories is not None:
+            encoder_options["categories"] = [list(self.categories[col]) for col in self.categorical_features]
         return ColumnTransformer(
             transformers=[
                 #  Scales to numbers so ML works better
-                ("num", StandardScaler(), self.numeric_features),
+                ("num", scaler, self.numeric_features),
                 # Categories into 0/1s
-                ("cat", OneHotEncoder(handle_unknown="ignore"), self.categorical_features),
+                ("cat", OneHotEncoder(handle_unknown="ignore", **encoder_options), self.categorical_features),
             ],
             # If not num/cat, just include them in output
-            remainder='passthrough'
-        )        
+            remainder='passthrough',
+            **({"sparse_threshold": _LAYOUTS[self.layout]} if self.layout is not None else {})
+        )
+
+    def load_and_split_data(self, filepath, test_size=0.25, random_state=42, chunksize=None, use_cache=False,
+                            compact=False):
+        """Loads data and splits it into training & testing
 
-    def load_and_split_data(self, filepath, test_size=0.25, random_state=42):
-        """Loads data and splits it into training & testing """
+        With chunksize set the file is streamed in chunks of that many rows
+        (see iter_split_chunks) instead of being parsed in one go. With
+        use_cache set it is read through the columnar cache (see load_dataframe),
+        with the same dtypes as a plain read unless compact is set too.
+        """
+        if chunksize is not None:
+            return self._load_and_split_chunked(filepath, test_size, random_state, chunksize)
         try:
             # Read data into dataframe
-            df = pd.read_csv(filepath, sep="\t")  
+            if use_cache:
+                df = self.load_dataframe(filepath, compact=compact)
+            else:
+                df = pd.read_csv(filepath, sep="\t")  
         except FileNotFoundError:
             print(f"Error: Dataset not found at {filepath}")
             return None, None, None, None
@@ -67,6 +150,108 @@ class DataPreprocessor:
         )
         return X_train, X_test, y_train, y_test
 
+    def load_dataframe(self, filepath, cache_dir=None, compact=False):
+        """Reads the TSV through a typed columnar cache (one .npy per column).
+
+        The first load parses the file and writes the cache under
+        cache_dir (default: .cache next to the file), keyed by the file's
+        sha256. Later loads memory-map the .npy files instead of parsing.
+        A changed mtime/size triggers a rehash, so edits invalidate the cache,
+        and entries for older contents of the file are deleted.
+
+        The columns have the same dtypes as pd.read_csv gives, so training on
+        the cache and on the file give the same model. compact=True reads with
+        COMPACT_DTYPES instead (int8/float32/category, a separate cache entry).
+        """
+        filepath = Path(filepath)
+        stat = filepath.stat()
+        cache_dir = Path(cache_dir) if cache_dir is not None else filepath.parent / ".cache"
+        pointer = cache_dir / f"{filepath.name}.json"
+
+        # Cheap check first: same mtime and size as last time means same contents
+        source = _read_json(pointer)
+        if source is None or (source["mtime_ns"], source["size"]) != (stat.st_mtime_ns, stat.st_size):
+            source = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": _file_sha256(filepath)}
+        entry = cache_dir / f"{filepath.stem}-{source['sha256'][:16]}{'-compact' if compact else ''}"
+
+        manifest = _read_json(entry / "manifest.json")
+        if manifest is not None and manifest["sha256"] == source["sha256"]:
+            df = _read_column_cache(entry, manifest)
+        else:
+            df = pd.read_csv(filepath, sep="\t", dtype=COMPACT_DTYPES if compact else None)
+            if df.empty:
+                return df
+            _write_column_cache(df, entry, source["sha256"])
+            _prune_column_cache(cache_dir, filepath.stem, source["sha256"][:16])
+        _write_json(pointer, source)
+        return df
+
+    def iter_chunks(self, filepath, chunksize=100_000, require_target=True):
+        """Streams the TSV in chunks with compact dtypes, checking every chunk has the required columns."""
+        required = self.categorical_features + self.numeric_features
+        if require_target:
+            required = required + [self.target_col]
+        reader = pd.read_csv(filepath, sep="\t", chunksize=chunksize, dtype=COMPACT_DTYPES)
+        for chunk in reader:
+            missing = [col for col in required if col not in chunk.columns]
+            if missing:
+                raise MissingColumnsError(f"Chunk starting at row {chunk.index[0]} is missing columns: {missing}")
+            yield chunk
+
+    def iter_split_chunks(self, filepath, chunksize=100_000, test_size=0.25, random_state=42):
+        """Streams (X_train, X_test, y_train, y_test) one chunk at a time.
+
+        Each class in each chunk sends test_size of its rows to the test part,
+        the fractional leftover is carried into the next chunk so the overall
+        split stays stratified. Same file, chunksize and random_state give the
+        same split every run.
+        """
+        rng = np.random.default_rng(random_state)
+        carry = {}
+        for chunk in self.iter_chunks(filepath, chunksize):
+            y = chunk[self.target_col].astype(int)
+            labels = y.to_numpy()
+            is_test = np.zeros(len(chunk), dtype=bool)
+            for label in np.unique(labels):
+                rows = np.flatnonzero(labels == label)
+                wanted = len(rows) * test_size + carry.get(label, 0.0)
+                n_test = int(wanted)
+                carry[label] = wanted - n_test
+                is_test[rng.choice(rows, size=n_test, replace=False)] = True
+
+            X = chunk[self.categorical_features + self.numeric_features]
+            yield X[~is_test], X[is_test], y[~is_test], y[is_test]
+
+    def _load_and_split_chunked(self, filepath, test_size, random_state, chunksize):
+        """Chunked version of load_and_split_data, only ever parses chunksize rows at a time."""
+        parts = ([], [], [], [])
+        try:
+            for split in self.iter_split_chunks(filepath, chunksize, test_size, random_state):
+                for part, frame in zip(parts, split):
+                    part.append(frame)
+        except FileNotFoundError:
+            print(f"Error: Dataset not found at {filepath}")
+            return None, None, None, None
+        except (MissingColumnsError, pd.errors.EmptyDataError):
+            # Anything else (a bad value, an overflowing dtype) propagates with its own message
+            print("File is empty or missing required columns.")
+            return None, None, None, None
+        if not parts[0]:
+            print("File is empty or missing required columns.")
+            return None, None, None, None
+
+        X_train = self._concat_chunks(parts[0])
+        X_test = self._concat_chunks(parts[1])
+        return X_train, X_test, pd.concat(parts[2]), pd.concat(parts[3])
+
+    def _concat_chunks(self, frames):
+        # Each chunk has its own categories, line them up so concat keeps the category dtype
+        for col in self.categorical_features:
+            if isinstance(frames[0][col].dtype, pd.CategoricalDtype):
+                categories = union_categoricals([frame[col] for frame in frames]).categories
+                frames = [frame.assign(**{col: frame[col].cat.set_categories(categories)}) for frame in frames]
+        return pd.concat(frames)
+
     def fit_preprocessor(self, X_train):
         # Train preprocessor using training data
         self.preprocessor.fit(X_train)
@@ -95,13 +280,84 @@ class DataPreprocessor:
             return None
 
 
+def _file_sha256(filepath, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _write_json(path, data):
+    # Write then rename, so readers never see half a file
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def _write_column_cache(df, entry, sha256):
+    """Writes each column of df as its own .npy (categoricals as codes + categories in the manifest)."""
+    entry.parent.mkdir(parents=True, exist_ok=True)
+    tmp_dir = Path(tempfile.mkdtemp(dir=entry.parent, prefix=entry.name + "."))
+    columns = []
+    for i, col in enumerate(df.columns):
+        values = df[col]
+        if not isinstance(values.dtype, pd.CategoricalDtype) and not pd.api.types.is_numeric_dtype(values.dtype):
+            values = values.astype("category")
+        # The dtype read_csv gave, strings are stored as codes and turned back into it
+        column = {"name": col, "file": f"{i}.npy", "dtype": str(df[col].dtype)}
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            column["categories"] = values.cat.categories.tolist()
+            values = values.cat.codes
+        np.save(tmp_dir / column["file"], values.to_numpy())
+        columns.append(column)
+    with open(tmp_dir / "manifest.json", "w") as f:
+        json.dump({"sha256": sha256, "rows": len(df), "columns": columns}, f)
+    # Another process may have written the same entry meanwhile, theirs is just as good
+    try:
+        os.rename(tmp_dir, entry)
+    except OSError:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def _read_column_cache(entry, manifest):
+    data = {}
+    for column in manifest["columns"]:
+        values = np.load(entry / column["file"], mmap_mode="r")
+        if "categories" in column:
+            values = pd.Categorical.from_codes(values, categories=column["categories"])
+            if column.get("dtype", "category") != "category":
+                values = pd.Series(values).astype(column["dtype"]).to_numpy()
+        data[column["name"]] = values
+    return pd.DataFrame(data)
+
+
+def _prune_column_cache(cache_dir, stem, current):
+    """Deletes cache entries for older contents of the file (both modes), keeping the current ones."""
+    pattern = re.compile(re.escape(stem) + r"-([0-9a-f]{16})(-compact)?")
+    for path in cache_dir.iterdir():
+        match = pattern.fullmatch(path.name)
+        if match and match.group(1) != current and path.is_dir():
+            shutil.rmtree(path, ignore_errors=True)
+
+
 if __name__ == "__main__":
     DATA_PATH = "data/loan_applications.csv"
 
     preprocessor_obj = DataPreprocessor()
 
     # Load and split the data into train/test sets
-    X_train, X_test, y_train, y_test = preprocessor_obj.load_and_split_data(DATA_PATH)
+    X_train, X_test, y_train, y_test = preprocessor_obj.load_and_split_data(DATA_PATH, use_cache=True)
 
     # If data loaded successfully, continue
     if X_train is not None:
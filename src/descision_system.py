@@ -1,30 +1,221 @@
+from time import perf_counter
+import numpy as np
 import pandas as pd
-from ml_model_training import MLModelTrainer
-from rule_engine import RuleEngine
-from data_preprocessing import DataPreprocessor
-import joblib
+from rule_engine import RuleEngine, decisions_frame
+from decision_store import DecisionResults
+from model_registry import load_model_state, scorer_state
+from shared_model import SharedModel
 
 class LoanDecisionSystem:
-    def __init__(self, model_path="models/logistic_regression_model.joblib"):
-        self.ml_model = joblib.load(model_path)
-        if self.ml_model is None:
-            print("Model not loaded. Train and save the model first.")
-            raise Exception("Model not loaded.")
+    def __init__(self, model_path="models/logistic_regression_model.joblib", fast_path=False, pd_cache=None,
+                 metrics=None, trace=False, audit_log=None):
+        self.fast_path = fast_path
+        # Optional PDCache in front of make_decision
+        self.pd_cache = pd_cache
+        # Optional DecisionMetrics, no timing at all when None
+        self.metrics = metrics
+        # Print each predicted PD (used to be always on)
+        self.trace = trace
+        # Optional (started) AuditLog, every decision is queued to it with the model and rule versions.
+        # Its find() needs an id column in the applicants (AuditLog id_field, "applicant_id" by default)
+        self.audit_log = audit_log
+        self.load_model(model_path)
         self.rule_engine = RuleEngine()
 
+    def load_model(self, model_path):
+        """Loads (or reloads) the model artifact, dropping PDs cached for the previous one.
+
+        model_path can also be a slim .json model (see compiled_scorer.py), which loads
+        without importing sklearn, or a shared model directory (see shared_model.py), which
+        is memory-mapped rather than unpickled.
+        """
+        if SharedModel.is_shared_model_dir(model_path):
+            self.shared_model = SharedModel(model_path)
+            self.swap_model(scorer_state(self.shared_model.scorer, self.shared_model.version))
+            return
+        self.shared_model = None
+        self.swap_model(load_model_state(model_path, self.fast_path))
+
+    def swap_model(self, model):
+        """Makes model (a ModelState) the live one in a single assignment."""
+        # Calls already running keep the state they started with
+        self.model = model
+        if self.pd_cache is not None:
+            self.pd_cache.clear()
+
+    # The live model's parts, all from the same ModelState
+    @property
+    def ml_model(self):
+        return self.model.ml_model
+
+    @property
+    def feature_schema(self):
+        return self.model.feature_schema
+
+    @property
+    def scorer(self):
+        return self.model.scorer
+
+    @property
+    def model_version(self):
+        return self.model.version
+
+    def refresh_shared_model(self):
+        """Switches to a newly published shared model segment, if any. Returns True on a switch."""
+        if self.shared_model is None or not self.shared_model.refresh():
+            return False
+        self.swap_model(scorer_state(self.shared_model.scorer, self.shared_model.version))
+        return True
+
+    def predict_pd(self, applicant_data, model=None):
+        """PD for one applicant, served from the PD cache when one is set.
+
+        model defaults to the live ModelState, read once so a concurrent swap can't mix versions.
+        """
+        model = model or self.model
+        metrics = self.metrics
+        # A missing category would be scored as an unknown one, reject it like the batch path does
+        for name in model.feature_schema.categorical_features:
+            value = applicant_data[name]
+            if value is None or value != value:
+                raise ValueError(f"Applicant has no value for {name}")
+        key = None
+        if self.pd_cache is not None:
+            key = self.pd_cache.make_key(applicant_data, model.version, model.feature_schema.columns)
+            pd_value = self.pd_cache.get(key)
+            if pd_value is not None:
+                return pd_value
+
+        if model.scorer is not None:
+            # Fast path, no DataFrame or sklearn call
+            start = perf_counter() if metrics is not None else 0.0
+            pd_value = model.scorer.predict_pd(applicant_data)
+            if metrics is not None:
+                metrics.observe("predict", perf_counter() - start)
+        else:
+            start = perf_counter() if metrics is not None else 0.0
+            # Make DataFrame for prediction
+            df = model.feature_schema.frame([applicant_data])
+            framed = perf_counter() if metrics is not None else 0.0
+            # Predict PD
+            pd_value = model.ml_model.predict_proba(df)[0][1]
+            if metrics is not None:
+                metrics.observe("frame", framed - start)
+                metrics.observe("predict", perf_counter() - framed)
+
+        if key is not None:
+            self.pd_cache.put(key, pd_value)
+        return pd_value
+
     def make_decision(self, applicant_data):
-        # Get feature names from DataPreprocessor
-        preprocessor = DataPreprocessor()
-        features = preprocessor.numeric_features + preprocessor.categorical_features
-        # Make DataFrame for prediction
-        df = pd.DataFrame([applicant_data], columns=features)
-        # Predict PD
-        pd_value = self.ml_model.predict_proba(df)[0][1]
-        print("Predicted PD:", round(pd_value, 4))
-        # Apply rules
-        result = self.rule_engine.apply_rules(applicant_data, pd_value)
+        metrics = self.metrics
+        audit_log = self.audit_log
+        start = perf_counter() if metrics is not None else 0.0
+        model = self.model
+        pd_value = self.predict_pd(applicant_data, model)
+        if self.trace:
+            print("Predicted PD:", round(pd_value, 4))
+        rules_start = perf_counter() if metrics is not None else 0.0
+        # Apply rules, always with the current parameters even when the PD was cached
+        if audit_log is None:
+            result = self.rule_engine.apply_rules(applicant_data, pd_value)
+        else:
+            # Log the version of the rule set that actually decided
+            rules = self.rule_engine.rule_set
+            result = rules.apply(applicant_data, pd_value)
+            audit_log.record(applicant_data, result, model.version, rules.version)
+        if metrics is not None:
+            end = perf_counter()
+            metrics.record_decision(result, end - rules_start, end - start)
         return result
 
+    def predict_pds(self, applicants, model=None):
+        """Feature frame and PDs for a batch of applicants (DataFrame or list of dicts), one model call."""
+        model = model or self.model
+        metrics = self.metrics
+        start = perf_counter() if metrics is not None else 0.0
+        features = list(model.feature_schema.columns)
+        if isinstance(applicants, pd.DataFrame):
+            df = applicants
+        else:
+            df = pd.DataFrame(list(applicants))
+        # Missing feature columns raise KeyError here rather than scoring NaNs
+        df = df[features]
+        # Rows missing only some features come through as nulls, which the encoder would score as
+        # unknown categories: reject them, as make_decision does for a single applicant
+        missing = df.isna().to_numpy().any(axis=1)
+        if missing.any():
+            rows = df.index[missing].tolist()
+            raise ValueError(f"{len(rows)} applicant(s) with missing features, rows {rows[:10]}")
+        framed = perf_counter() if metrics is not None else 0.0
+        # Predict PD for every row at once
+        if model.scorer is not None:
+            pd_values = model.scorer.predict_pd_batch(df)
+        else:
+            pd_values = np.asarray(model.ml_model.predict_proba(df))[:, 1]
+        if metrics is not None:
+            metrics.observe("batch_frame", framed - start)
+            metrics.observe("batch_predict", perf_counter() - framed)
+        return df, pd_values
+
+    def make_decisions(self, applicants, model=None, rule_set=None):
+        """Scores a batch of applicants (DataFrame or list of dicts) with one predict_proba call.
+
+        model/rule_set default to the live ones; pass both to score several chunks
+        against the same snapshot (see batch_executor.py).
+        """
+        metrics = self.metrics
+        audit_log = self.audit_log
+        start = perf_counter() if metrics is not None else 0.0
+        model = model or self.model
+        if audit_log is not None and not isinstance(applicants, pd.DataFrame):
+            # Keep all the columns (ids too) for the audit log, not just the features
+            applicants = pd.DataFrame(list(applicants))
+        df, pd_values = self.predict_pds(applicants, model)
+        rules_start = perf_counter() if metrics is not None else 0.0
+        # Apply rules column-wise, decoding with the same rule set that made the masks
+        rules = rule_set or self.rule_engine.rule_set
+        masks = rules.evaluate_batch(df, pd_values)
+        results = decisions_frame(masks, pd_values, df.index, rules.decode)
+        if metrics is not None:
+            end = perf_counter()
+            metrics.observe("batch_rules", end - rules_start)
+            metrics.observe("batch_total", end - start)
+            metrics.record_masks(masks, rules.reasons)
+        if audit_log is not None:
+            audit_log.record_batch(applicants, results, model.version, rules.version)
+        return results
+
+    def make_decision_results(self, applicants, row_ids=None):
+        """Like make_decisions, but as compact DecisionResults (typed arrays, no per-row lists).
+
+        row_ids default to the applicants' DataFrame index when it is an integer index,
+        otherwise (string ids, a list of dicts) to positions 0..n-1.
+        """
+        metrics = self.metrics
+        audit_log = self.audit_log
+        start = perf_counter() if metrics is not None else 0.0
+        model = self.model
+        if audit_log is not None and not isinstance(applicants, pd.DataFrame):
+            applicants = pd.DataFrame(list(applicants))
+        df, pd_values = self.predict_pds(applicants, model)
+        rules_start = perf_counter() if metrics is not None else 0.0
+        rules = self.rule_engine.rule_set
+        masks = rules.evaluate_batch(df, pd_values)
+        if row_ids is None:
+            row_ids = df.index.to_numpy() if pd.api.types.is_integer_dtype(df.index) else np.arange(len(df))
+        results = DecisionResults.from_masks(masks, pd_values, row_ids, rules.reasons)
+        if metrics is not None:
+            end = perf_counter()
+            metrics.observe("batch_rules", end - rules_start)
+            metrics.observe("batch_total", end - start)
+            metrics.record_masks(masks, rules.reasons)
+        if audit_log is not None:
+            # The audit log takes the usual decisions frame, only built when there is one
+            decisions = decisions_frame(masks, pd_values, df.index, rules.decode)
+            audit_log.record_batch(applicants, decisions, model.version, rules.version)
+        return results
+
     def update_rule_parameters(self, **kwargs):
         self.rule_engine.update_rules(**kwargs)
 
@@ -66,7 +257,7 @@ if __name__ == "__main__":
     }
 
     try:
-        system = LoanDecisionSystem()
+        system = LoanDecisionSystem(trace=True)
         print("\n--- Applicant 1 ---")
         print(system.make_decision(applicant1))
         print("\n--- Applicant 2 ---")
@@ -0,0 +1,44 @@
+from dataclasses import dataclass
+
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class FeatureSchema:
+    """Immutable description of the model inputs, worked out once when the model is loaded.
+
+    numeric_features / categorical_features are the column names in scoring order, columns
+    both together. Values are not type-checked here: the model raises on bad numerics, and
+    LoanDecisionSystem rejects missing ones.
+    """
+    numeric_features: tuple
+    categorical_features: tuple
+
+    def __post_init__(self):
+        # Frozen, so normalise through object.__setattr__
+        object.__setattr__(self, "numeric_features", tuple(self.numeric_features))
+        object.__setattr__(self, "categorical_features", tuple(self.categorical_features))
+        object.__setattr__(self, "columns", self.numeric_features + self.categorical_features)
+
+    @classmethod
+    def from_pipeline(cls, pipeline):
+        """Reads the schema out of a fitted Pipeline(ColumnTransformer, classifier).
+
+        Raises ValueError when the object has no fitted ColumnTransformer to read from.
+        """
+        named_steps = getattr(pipeline, "named_steps", None)
+        column_transformer = named_steps.get("preprocessor") if named_steps else None
+        if column_transformer is None or not hasattr(column_transformer, "transformers_"):
+            raise ValueError("Model is not a fitted preprocessing pipeline.")
+
+        numeric, categorical = [], []
+        for name, transformer, columns in column_transformer.transformers_:
+            if name == "remainder" or (isinstance(transformer, str) and transformer == "drop"):
+                continue
+            # One-hot encoded columns are the categorical ones
+            (categorical if hasattr(transformer, "categories_") else numeric).extend(columns)
+        return cls(numeric, categorical)
+
+    def frame(self, rows):
+        """Builds the model input DataFrame (columns in schema order) from a list of applicant dicts."""
+        return pd.DataFrame(rows, columns=self.columns)
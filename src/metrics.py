@@ -0,0 +1,189 @@
+"""
+Latency and decision metrics for LoanDecisionSystem.
+
+Stage timings go into fixed-bucket histograms (one bisect and two adds per
+observation, well under a microsecond), decisions and reasons into counters. Everything can be
+exported as Prometheus text or written as one structured JSON log line.
+A system created without a DecisionMetrics does no timing at all.
+DecisionMetrics can be shared between threads, updates and reads hold one
+lock (an uncontended acquire is well under a microsecond too).
+
+Stages recorded by LoanDecisionSystem:
+- single applicant: frame (DataFrame build), predict, rules, total
+- batches: batch_frame, batch_predict, batch_rules, batch_total
+"""
+import json
+import logging
+import threading
+from bisect import bisect_left
+
+import numpy as np
+
+from rule_engine import ALL_CRITERIA_MET, REASONS
+
+# Upper bounds in seconds, from a few microseconds (compiled scorer) up to a second (big batches)
+DEFAULT_BUCKETS = (5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3,
+                   1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0)
+
+
+def _label(value):
+    """A label value escaped for the Prometheus text format (backslash, double quote, newline)."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Histogram:
+    """Counts of observations per bucket (the last one is +Inf), plus their sum."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+
+    @property
+    def count(self):
+        return sum(self.counts)
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th quantile (inf if it is past the last bucket)."""
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class DecisionMetrics:
+    """Per-stage timing histograms, request/row counts and decision/reason distributions."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, prefix="loan_decision"):
+        self.buckets = tuple(buckets)
+        self.prefix = prefix
+        self.stages = {}
+        # Plain dicts, a Counter's += is about twice as slow
+        self.requests = {}
+        self.rows = 0
+        self.decisions = {}
+        self.reasons = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            self._observe(stage, seconds)
+
+    def _observe(self, stage, seconds):
+        histogram = self.stages.get(stage)
+        if histogram is None:
+            histogram = self.stages[stage] = Histogram(self.buckets)
+        histogram.observe(seconds)
+
+    def record_decision(self, result, rules_seconds=None, total_seconds=None):
+        """Counts one apply_rules result dict, and the rules/total stage times if given.
+
+        Done in one call because it runs on every single-applicant decision.
+        """
+        with self._lock:
+            if rules_seconds is not None:
+                self._observe("rules", rules_seconds)
+            if total_seconds is not None:
+                self._observe("total", total_seconds)
+            self.requests["single"] = self.requests.get("single", 0) + 1
+            self.rows += 1
+            decision = result["Decision"]
+            self.decisions[decision] = self.decisions.get(decision, 0) + 1
+            reasons = self.reasons
+            for reason in result["Reasons"]:
+                reasons[reason] = reasons.get(reason, 0) + 1
+
+    def record_masks(self, masks, reasons=REASONS):
+        """Counts a batch from its RuleEngine.evaluate_batch reason masks, without decoding them.
+
+        reasons: the RuleSet.reasons the masks' bits stand for.
+        """
+        masks = np.asarray(masks)
+        rejected = int(np.count_nonzero(masks))
+        approved = len(masks) - rejected
+        counts = [(self.decisions, "Rejected", rejected), (self.decisions, "Approved", approved),
+                  (self.reasons, ALL_CRITERIA_MET, approved)]
+        counts += [(self.reasons, reason, int(np.count_nonzero(masks & (1 << bit))))
+                   for bit, reason in enumerate(reasons)]
+        with self._lock:
+            self.requests["batch"] = self.requests.get("batch", 0) + 1
+            self.rows += len(masks)
+            # Only touch counters that moved, so the distributions match per-row counting
+            for counter, name, count in counts:
+                if count:
+                    counter[name] = counter.get(name, 0) + count
+
+    def reset(self):
+        with self._lock:
+            self.stages.clear()
+            self.requests.clear()
+            self.rows = 0
+            self.decisions.clear()
+            self.reasons.clear()
+
+    def snapshot(self):
+        """Plain dict of everything recorded, with p50/p99 per stage (bucket upper bounds, in ms)."""
+        with self._lock:
+            return self._snapshot()
+
+    def _snapshot(self):
+        return {
+            "stages": {
+                stage: {
+                    "count": h.count,
+                    "mean_ms": h.sum / h.count * 1e3 if h.count else 0.0,
+                    "p50_ms": h.quantile(0.5) * 1e3,
+                    "p99_ms": h.quantile(0.99) * 1e3,
+                }
+                for stage, h in sorted(self.stages.items())
+            },
+            "requests": dict(self.requests),
+            "rows": self.rows,
+            "decisions": dict(self.decisions),
+            "reasons": dict(self.reasons),
+        }
+
+    def log(self, logger=None, level=logging.INFO):
+        """Writes the snapshot as one JSON log line."""
+        logger = logger or logging.getLogger("loan_decision.metrics")
+        logger.log(level, json.dumps(self.snapshot(), sort_keys=True))
+
+    def to_prometheus(self):
+        """Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            return self._prometheus()
+
+    def _prometheus(self):
+        p = self.prefix
+        lines = [
+            f"# HELP {p}_stage_seconds Time spent in each stage of a decision.",
+            f"# TYPE {p}_stage_seconds histogram",
+        ]
+        for stage, h in sorted(self.stages.items()):
+            stage = _label(stage)
+            cumulative = 0
+            for bound, count in zip(h.buckets + (float("inf"),), h.counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{p}_stage_seconds_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+            lines.append(f'{p}_stage_seconds_sum{{stage="{stage}"}} {h.sum!r}')
+            lines.append(f'{p}_stage_seconds_count{{stage="{stage}"}} {h.count}')
+
+        lines += [f"# HELP {p}_requests_total Scoring calls by kind.", f"# TYPE {p}_requests_total counter"]
+        lines += [f'{p}_requests_total{{kind="{_label(kind)}"}} {n}' for kind, n in sorted(self.requests.items())]
+        lines += [f"# HELP {p}_rows_total Applicants scored.", f"# TYPE {p}_rows_total counter",
+                  f"{p}_rows_total {self.rows}"]
+        lines += [f"# HELP {p}_decisions_total Decisions by outcome.", f"# TYPE {p}_decisions_total counter"]
+        lines += [f'{p}_decisions_total{{decision="{_label(d)}"}} {n}' for d, n in sorted(self.decisions.items())]
+        lines += [f"# HELP {p}_reasons_total Decision reasons given.", f"# TYPE {p}_reasons_total counter"]
+        lines += [f'{p}_reasons_total{{reason="{_label(r)}"}} {n}' for r, n in sorted(self.reasons.items())]
+        return "\n".join(lines) + "\n"
@@ -1,25 +1,154 @@
 import pandas as pd
 import numpy as np
-from sklearn.linear_model import LogisticRegression
+from sklearn.linear_model import LogisticRegression, SGDClassifier
 from sklearn.metrics import roc_auc_score, average_precision_score, confusion_matrix, classification_report
 from sklearn.utils.class_weight import compute_class_weight
 from sklearn.metrics import brier_score_loss
+import copy
+import os
+import time
+import warnings
 import joblib
+from joblib import Parallel, delayed
 
 from data_preprocessing import DataPreprocessor
+from sklearn.base import clone
+from sklearn.model_selection import StratifiedKFold, ParameterGrid
 from sklearn.pipeline import Pipeline
 
+# Candidate settings for search_hyperparameters (lbfgs only supports l2)
+DEFAULT_PARAM_GRID = [
+    {"C": [0.01, 0.1, 1.0, 10.0], "penalty": ["l2"], "solver": ["lbfgs", "liblinear"],
+     "class_weight": ["balanced", None]},
+    {"C": [0.01, 0.1, 1.0, 10.0], "penalty": ["l1"], "solver": ["liblinear", "saga"],
+     "class_weight": ["balanced", None]},
+]
+
+
+def _logistic_regression(penalty="l2", **params):
+    """LogisticRegression with the penalty spelled however the installed sklearn wants it."""
+    # sklearn >= 1.8 deprecates penalty= in favour of l1_ratio (0 = l2, 1 = l1)
+    if LogisticRegression().get_params().get("penalty") == "deprecated":
+        return LogisticRegression(l1_ratio={"l2": 0.0, "l1": 1.0}[penalty], **params)
+    return LogisticRegression(penalty=penalty, **params)
+
+
+def _fit_and_score(params, fold):
+    """Fits one candidate on one already-preprocessed fold, returns its metrics and wall time."""
+    X_train, y_train, X_val, y_val = fold
+    start = time.perf_counter()
+    with warnings.catch_warnings():
+        # Some weak-regularisation candidates hit max_iter, their scores still count
+        warnings.simplefilter("ignore")
+        model = _logistic_regression(max_iter=1000, random_state=42, **params).fit(X_train, y_train)
+    y_proba = model.predict_proba(X_val)[:, 1]
+    return {
+        "roc_auc": roc_auc_score(y_val, y_proba),
+        "pr_auc": average_precision_score(y_val, y_proba),
+        "brier": brier_score_loss(y_val, y_proba),
+        "seconds": time.perf_counter() - start,
+    }
+
+def misclassification_cost(fn_cost=1.0, fp_cost=0.2):
+    """Cost function for cutoff_table: fn_cost per defaulter approved, fp_cost per good applicant rejected."""
+    return lambda table: fn_cost * table["fn"] + fp_cost * table["fp"]
+
+
+def cutoff_table(y_true, y_proba, cutoffs=None, cost_fn=None, exposure=None):
+    """Confusion counts, precision/recall, approval rate and losses for every PD cutoff (reject when PD >= cutoff).
+
+    The PDs are sorted once; each cutoff is then a searchsorted into them and
+    every count a lookup in a cumulative sum, so the whole sweep is O(n log n)
+    however many cutoffs there are. cutoffs defaults to 0.001 steps, pass
+    np.unique(y_proba) for every distinct one. exposure (e.g. loan_amount)
+    weights expected_loss, the model's sum of PD x exposure over the approved.
+    cost_fn gets the table and returns one cost per row (misclassification_cost()
+    by default).
+    """
+    y_proba = np.asarray(y_proba, dtype=float)
+    order = np.argsort(y_proba, kind="stable")
+    sorted_pds = y_proba[order]
+    # Prefix sums with a leading 0, so index k sums the k lowest PDs
+    defaults_cum = np.concatenate(([0], np.cumsum(np.asarray(y_true)[order])))
+    weights = sorted_pds if exposure is None else sorted_pds * np.asarray(exposure, dtype=float)[order]
+    loss_cum = np.concatenate(([0.0], np.cumsum(weights)))
+
+    if cutoffs is None:
+        cutoffs = np.arange(1, 1000) / 1000
+    cutoffs = np.asarray(cutoffs, dtype=float)
+    n = len(y_proba)
+    approved = np.searchsorted(sorted_pds, cutoffs, side="left")
+    fn = defaults_cum[approved]
+    positives = defaults_cum[-1]
+    tp = positives - fn
+    fp = (n - approved) - tp
+    tn = approved - fn
+    with np.errstate(invalid="ignore", divide="ignore"):
+        table = pd.DataFrame({
+            "cutoff": cutoffs,
+            "approved": approved,
+            "approval_rate": approved / n,
+            "tp": tp, "fp": fp, "tn": tn, "fn": fn,
+            # Positive class = default, i.e. precision/recall of the rejections
+            "precision": tp / (tp + fp),
+            "recall": tp / positives if positives else np.nan,
+            "approved_default_rate": fn / approved,
+            "expected_loss": loss_cum[approved],
+        })
+    table["cost"] = (cost_fn or misclassification_cost())(table)
+    return table
+
+
+def _partial_fit_scaler(transformer, X):
+    """Folds X into a fitted StandardScaler's running mean/variance (or the scaler at the end of a Pipeline)."""
+    if hasattr(transformer, "steps"):
+        # e.g. the float32 cast in front of the scaler
+        X = transformer[:-1].transform(X)
+        transformer = transformer.steps[-1][1]
+    transformer.partial_fit(X)
+
+def _warm_start_from(previous_pipeline, X_new):
+    """Copy of a fitted pipeline with its scaler updated by X_new and the classifier ready to warm start.
+
+    The numeric coefficients are re-expressed for the updated scaler, so before any fitting
+    the copy gives exactly the previous PDs.
+    """
+    pipeline = copy.deepcopy(previous_pipeline)
+    preprocessor = pipeline.named_steps["preprocessor"]
+    classifier = pipeline.steps[-1][1]
+    numeric = preprocessor.named_transformers_["num"]
+    scaler = numeric.steps[-1][1] if hasattr(numeric, "steps") else numeric
+    old_mean, old_scale = scaler.mean_.copy(), scaler.scale_.copy()
+    numeric_columns = next(columns for name, _, columns in preprocessor.transformers_ if name == "num")
+    _partial_fit_scaler(numeric, X_new[numeric_columns])
+
+    # w.(x - m0)/s0 == (w*s1/s0).(x - m1)/s1 - w.(m0 - m1)/s0
+    block = preprocessor.output_indices_["num"]
+    weights = classifier.coef_[:, block]
+    classifier.intercept_ = classifier.intercept_ + weights @ ((scaler.mean_ - old_mean) / old_scale)
+    classifier.coef_[:, block] = weights * scaler.scale_ / old_scale
+    classifier.set_params(warm_start=True)
+    return pipeline
+
 class MLModelTrainer:
     def __init__(self, model_filepath="models/logistic_regression_model.joblib"):
         self.model = None
         self.model_filepath = model_filepath
 
-    def train_model(self, X_train, y_train, preprocessor):
-        """Trains a logistic regression model with class weighting."""
+    def train_model(self, X_train, y_train, preprocessor, **classifier_params):
+        """Trains a logistic regression model with class weighting.
+
+        classifier_params (e.g. the best_params from search_hyperparameters) override the defaults.
+        """
         class_weights = compute_class_weight(class_weight='balanced', classes=np.unique(y_train), y=y_train)
         class_weight_dict = {i: weight for i, weight in enumerate(class_weights)}
 
-        self.model = LogisticRegression(class_weight=class_weight_dict, max_iter=1000, random_state=42)
+        params = {"class_weight": class_weight_dict, "max_iter": 1000, "random_state": 42}
+        params.update(classifier_params)
+        if classifier_params:
+            self.model = _logistic_regression(**params)
+        else:
+            self.model = LogisticRegression(**params)
 
         self.pipeline = Pipeline(steps=[
             ('preprocessor', preprocessor),
@@ -28,6 +157,154 @@ class MLModelTrainer:
 
         self.pipeline.fit(X_train, y_train)
 
+    def search_hyperparameters(self, X, y, preprocessor, param_grid=None, n_splits=5, n_jobs=-1, random_state=42):
+        """Stratified k-fold CV over a grid of C/penalty/solver/class_weight, across a process pool.
+
+        The preprocessor is fitted once per fold and the transformed fold is
+        shared by every candidate, so only the classifier fits are repeated.
+        Returns one row per candidate (best mean ROC-AUC first) with mean
+        ROC-AUC/PR-AUC/Brier over the folds and the candidate's total fit time.
+        The winning settings are kept in self.best_params.
+        """
+        y = np.asarray(y).astype(int)
+        folds = []
+        for train_idx, val_idx in StratifiedKFold(n_splits, shuffle=True, random_state=random_state).split(X, y):
+            fold_preprocessor = clone(preprocessor).fit(X.iloc[train_idx])
+            folds.append((fold_preprocessor.transform(X.iloc[train_idx]), y[train_idx],
+                          fold_preprocessor.transform(X.iloc[val_idx]), y[val_idx]))
+
+        candidates = list(ParameterGrid(param_grid or DEFAULT_PARAM_GRID))
+        start = time.perf_counter()
+        # Default joblib backend is a process pool, n_jobs=-1 uses every core
+        scores = Parallel(n_jobs=n_jobs)(
+            delayed(_fit_and_score)(params, fold) for params in candidates for fold in folds
+        )
+        print(f"Searched {len(candidates)} candidates x {n_splits} folds in {time.perf_counter() - start:.1f}s")
+
+        rows = []
+        for i, params in enumerate(candidates):
+            fold_scores = pd.DataFrame(scores[i * n_splits:(i + 1) * n_splits])
+            rows.append({
+                **params,
+                "roc_auc": fold_scores["roc_auc"].mean(),
+                "roc_auc_std": fold_scores["roc_auc"].std(),
+                "pr_auc": fold_scores["pr_auc"].mean(),
+                "brier": fold_scores["brier"].mean(),
+                "fit_seconds": fold_scores["seconds"].sum(),
+            })
+        results = pd.DataFrame(rows).sort_values("roc_auc", ascending=False).reset_index(drop=True)
+        self.best_params = candidates[int(np.argmax([row["roc_auc"] for row in rows]))]
+        return results
+
+    def train_out_of_core(self, filepath, data_preprocessor, epochs=5, chunksize=100_000, test_size=0.25,
+                          random_state=42, alpha=1e-4):
+        """Trains an SGD logistic model on a TSV streamed chunk by chunk, never holding it all in memory.
+
+        data_preprocessor must have a fixed vocabulary (DataPreprocessor(categories=...)), so
+        every chunk one-hot encodes to the same columns. The file is read epochs + 2 times:
+        - pass 1: the scaler's running mean/variance and the class counts, over the training rows
+        - epochs passes: SGDClassifier(loss="log_loss").partial_fit, chunk by chunk, rows shuffled;
+          averaged weights (average=True) settle close to the batch LogisticRegression
+        - last pass: ROC-AUC/PR-AUC/Brier on the held-out rows (same split as iter_split_chunks)
+        The result is a Pipeline like train_model's, so the decision path and CompiledScorer take it as is.
+        Returns the held-out metrics.
+        """
+        if data_preprocessor.categories is None:
+            raise ValueError("Out-of-core training needs a fixed vocabulary, pass DataPreprocessor(categories=...)")
+
+        def chunks():
+            return data_preprocessor.iter_split_chunks(filepath, chunksize, test_size, random_state)
+
+        preprocessor = clone(data_preprocessor.preprocessor)
+        class_counts = np.zeros(2)
+        for X_train, _, y_train, _ in chunks():
+            if not hasattr(preprocessor, "transformers_"):
+                preprocessor.fit(X_train)
+            else:
+                _partial_fit_scaler(preprocessor.named_transformers_["num"], X_train[data_preprocessor.numeric_features])
+            class_counts += np.bincount(y_train.to_numpy(), minlength=2)
+        # Same weights compute_class_weight("balanced") gives, from the streamed counts
+        class_weight = {i: class_counts.sum() / (2 * count) for i, count in enumerate(class_counts)}
+
+        self.model = SGDClassifier(loss="log_loss", alpha=alpha, class_weight=class_weight, average=True,
+                                   random_state=random_state)
+        rng = np.random.default_rng(random_state)
+        start = time.perf_counter()
+        for epoch in range(epochs):
+            for X_train, _, y_train, _ in chunks():
+                order = rng.permutation(len(X_train))
+                X = preprocessor.transform(X_train)[order]
+                self.model.partial_fit(X, y_train.to_numpy()[order], classes=np.array([0, 1]))
+            print(f"Epoch {epoch + 1}/{epochs} done ({time.perf_counter() - start:.1f}s)")
+
+        self.pipeline = Pipeline(steps=[
+            ('preprocessor', preprocessor),
+            ('classifier', self.model)
+        ])
+
+        y_true, y_proba = [], []
+        for _, X_test, _, y_test in chunks():
+            y_true.append(y_test.to_numpy())
+            y_proba.append(self.pipeline.predict_proba(X_test)[:, 1])
+        y_true, y_proba = np.concatenate(y_true), np.concatenate(y_proba)
+        return {
+            "roc_auc": roc_auc_score(y_true, y_proba),
+            "pr_auc": average_precision_score(y_true, y_proba),
+            "brier": brier_score_loss(y_true, y_proba),
+        }
+
+    def retrain_warm_start(self, X_new, y_new, previous_pipeline=None, X_recent=None, y_recent=None,
+                           compare_cold=False, max_iter=None):
+        """Retrains from the previous pipeline instead of from scratch.
+
+        - the scaler keeps its statistics and partial_fits only the new rows
+        - the previous coefficients are rescaled to the updated scaler and used as the
+          starting point (warm_start) of the classifier fit
+        - the one-hot vocabulary is kept as is
+        The classifier is fitted on X_new plus the X_recent window, so the cost follows the
+        size of the window rather than the full history. lbfgs runs to the optimum of the
+        rows it is given, wherever it starts: the warm start makes it faster but does not
+        change where it ends up. A fit on X_new alone would forget the history, so either
+        pass a recent window or cap max_iter (a bounded step from the previous model).
+        previous_pipeline defaults to the saved model. Returns n_iter and wall time, plus
+        the same for a cold fit on the same rows if compare_cold is set (which doubles the cost).
+        """
+        if X_recent is None and max_iter is None:
+            raise ValueError("Fitting on the new rows alone forgets the history: "
+                             "pass X_recent/y_recent, or max_iter to cap the update")
+        if previous_pipeline is None:
+            previous_pipeline = joblib.load(self.model_filepath)
+        start = time.perf_counter()
+        pipeline = _warm_start_from(previous_pipeline, X_new)
+        X_fit, y_fit = X_new, np.asarray(y_new)
+        if X_recent is not None:
+            X_fit = pd.concat([X_recent, X_new])
+            y_fit = np.concatenate([np.asarray(y_recent), y_fit])
+        classifier = pipeline.steps[-1][1]
+        default_max_iter = classifier.max_iter
+        if max_iter is not None:
+            classifier.set_params(max_iter=max_iter)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            # Only the classifier is fitted, refitting the pipeline would redo the preprocessor
+            classifier.fit(pipeline.named_steps["preprocessor"].transform(X_fit), y_fit)
+        # The cap is for this update only, not for the saved model's next retrain
+        classifier.set_params(max_iter=default_max_iter)
+        report = {"n_iter": int(np.max(classifier.n_iter_)), "seconds": time.perf_counter() - start}
+
+        if compare_cold:
+            start = time.perf_counter()
+            cold = clone(previous_pipeline).set_params(**{f"{pipeline.steps[-1][0]}__warm_start": False})
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                cold.fit(X_fit, y_fit)
+            report["cold_n_iter"] = int(np.max(cold.steps[-1][1].n_iter_))
+            report["cold_seconds"] = time.perf_counter() - start
+
+        self.pipeline = pipeline
+        self.model = classifier
+        return report
+
     def evaluate_model(self, X_test, y_test, pd_cutoff=0.12):
         if not hasattr(self, 'pipeline'):
             raise ValueError("Pipeline has not been trained yet, call train_model() first")
@@ -44,10 +321,33 @@ class MLModelTrainer:
 
         return y_proba, y_pred
     
+    def sweep_cutoffs(self, X_test, y_test, cutoffs=None, cost_fn=None, exposure=None, y_proba=None):
+        """Evaluates every PD cutoff in one pass (see cutoff_table), returns the table and the cheapest cutoff.
+
+        Pass y_proba (e.g. from evaluate_model) to skip predicting again.
+        """
+        if y_proba is None:
+            if not hasattr(self, 'pipeline'):
+                raise ValueError("Pipeline has not been trained yet, call train_model() first")
+            y_proba = self.pipeline.predict_proba(X_test)[:, 1]
+        table = cutoff_table(y_test, y_proba, cutoffs, cost_fn, exposure)
+        self.best_cutoff = float(table["cutoff"].iloc[int(np.argmin(table["cost"].to_numpy()))])
+        return table, self.best_cutoff
+
     def save_model(self):
         if not hasattr(self, 'pipeline'):
             raise ValueError("Pipeline has not been trained yet, call train_model() first")
-        joblib.dump(self.pipeline, self.model_filepath)
+        # Write next to the target and rename over it, so a watcher never loads a half-written file
+        tmp_path = f"{self.model_filepath}.tmp"
+        joblib.dump(self.pipeline, tmp_path)
+        os.replace(tmp_path, self.model_filepath)
+
+    def save_slim_model(self, filepath=None):
+        """Writes the inference-only JSON model next to the joblib one, loadable without sklearn."""
+        from compiled_scorer import CompiledScorer
+        filepath = filepath or os.path.splitext(self.model_filepath)[0] + ".json"
+        CompiledScorer.from_pipeline(self.pipeline).save(filepath)
+        return filepath
 
     def load_model(path="models/logistic_regression_model.joblib"):
         return joblib.load(path)
@@ -56,15 +356,70 @@ class MLModelTrainer:
 
 
 if __name__ == "__main__":
-    from data_preprocessing import DataPreprocessor
+    import sys
+    from data_preprocessing import DataPreprocessor, DECLARED_CATEGORIES
 
     DATA_PATH = "data/loan_applications.csv"
-    dp = DataPreprocessor()
-    X_train, X_test, y_train, y_test = dp.load_and_split_data(DATA_PATH)
+    if "--float32" in sys.argv:
+        # Half the memory for big training sets, fixed vocabulary and CSR layout
+        dp = DataPreprocessor(dtype=np.float32, layout="csr", categories=DECLARED_CATEGORIES)
+    elif "--out-of-core" in sys.argv:
+        dp = DataPreprocessor(categories=DECLARED_CATEGORIES)
+    else:
+        dp = DataPreprocessor()
+
+    if "--warm-start" in sys.argv:
+        # Nightly delta: update the saved model with the rows in the given TSV. With --recent FILE
+        # they are fitted together with that window (--recent-rows N keeps its last N rows);
+        # without one, the update is a capped number of iterations (--max-iter, default 10)
+        # from the previous model, so the history is never refitted in full by default
+        def option(name, default=None, cast=str):
+            return cast(sys.argv[sys.argv.index(name) + 1]) if name in sys.argv else default
+
+        new_rows = pd.read_csv(option("--warm-start"), sep="\t")
+        window = {}
+        if "--recent" in sys.argv:
+            recent = pd.read_csv(option("--recent"), sep="\t")
+            if "--recent-rows" in sys.argv:
+                recent = recent.tail(option("--recent-rows", cast=int))
+            window = {"X_recent": recent.drop(columns=[dp.target_col]), "y_recent": recent[dp.target_col]}
+        max_iter = option("--max-iter", None if window else 10, int)
+        trainer = MLModelTrainer()
+        compare_cold = "--compare-cold" in sys.argv
+        report = trainer.retrain_warm_start(new_rows.drop(columns=[dp.target_col]), new_rows[dp.target_col],
+                                            compare_cold=compare_cold, max_iter=max_iter, **window)
+        print(f"Warm start: {report['n_iter']} iterations in {report['seconds']:.2f}s")
+        if compare_cold:
+            print(f"Cold fit: {report['cold_n_iter']} iterations in {report['cold_seconds']:.2f}s")
+        trainer.save_model()
+        trainer.save_slim_model()
+        sys.exit(0)
+
+    if "--out-of-core" in sys.argv:
+        # Stream the file instead of loading it, for training sets bigger than memory
+        trainer = MLModelTrainer()
+        print("Held-out metrics:", trainer.train_out_of_core(DATA_PATH, dp))
+        trainer.save_model()
+        trainer.save_slim_model()
+        sys.exit(0)
+
+    X_train, X_test, y_train, y_test = dp.load_and_split_data(DATA_PATH, use_cache=True)
 
     if X_train is not None:
         preproc = dp.preprocessor
         trainer = MLModelTrainer()
-        trainer.train_model(X_train, y_train, preproc)
-        trainer.evaluate_model(X_test, y_test, pd_cutoff=0.12)
+        if "--search" in sys.argv:
+            # Pick the classifier settings by cross-validation first
+            print(trainer.search_hyperparameters(X_train, y_train, preproc).to_string())
+            print("Best params:", trainer.best_params)
+            trainer.train_model(X_train, y_train, preproc, **trainer.best_params)
+        else:
+            trainer.train_model(X_train, y_train, preproc)
+        y_proba, _ = trainer.evaluate_model(X_test, y_test, pd_cutoff=0.12)
+        if "--sweep" in sys.argv:
+            # Cost of every cutoff at once, instead of re-evaluating one at a time
+            table, best = trainer.sweep_cutoffs(X_test, y_test, exposure=X_test["loan_amount"], y_proba=y_proba)
+            print(table.iloc[::50].to_string(index=False))
+            print(f"Cheapest PD cutoff: {best}")
         trainer.save_model()
+        trainer.save_slim_model()
@@ -0,0 +1,191 @@
+"""
+Model artifacts as swappable units, plus a watcher that hot-reloads them.
+
+Everything LoanDecisionSystem derives from a model file (the model, its
+feature schema, the optional compiled scorer and the version) is bundled
+into one immutable ModelState. Swapping models is a single attribute
+assignment, so a request in flight keeps scoring against the state it
+started with and never sees half of an old model and half of a new one.
+
+ModelWatcher polls the artifact in a background thread. When its checksum
+changes it loads the new model off the request path, warms it and checks
+it against a golden set of applicants, and only then swaps it in.
+"""
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from compiled_scorer import CompiledScorer
+from feature_schema import FeatureSchema
+
+
+@dataclass(frozen=True)
+class ModelState:
+    """One loaded model artifact and everything worked out from it."""
+    ml_model: object
+    feature_schema: FeatureSchema
+    scorer: object
+    version: str
+
+
+def load_model_state(model_path, fast_path=False):
+    """Loads a model artifact into a ModelState without touching any live system.
+
+    A .json path is a slim CompiledScorer export (plain coefficients, no sklearn
+    needed); anything else is a joblib-pickled pipeline.
+    """
+    # Hash the same bytes we load, so the version always matches the model
+    # even if the file is replaced while we read it
+    with open(model_path, "rb") as f:
+        data = f.read()
+    # Short sha256 of the file
+    version = hashlib.sha256(data).hexdigest()[:16]
+    if str(model_path).endswith(".json"):
+        return scorer_state(CompiledScorer.from_dict(json.loads(data)), version)
+
+    # joblib (and through the pickle, sklearn) only when a pipeline is actually loaded
+    import joblib
+    ml_model = joblib.load(io.BytesIO(data))
+    if ml_model is None:
+        print("Model not loaded. Train and save the model first.")
+        raise Exception("Model not loaded.")
+    # Work out the input columns once here instead of on every request
+    try:
+        feature_schema = FeatureSchema.from_pipeline(ml_model)
+    except ValueError:
+        # Not a fitted pipeline (e.g. a bare estimator), use the training column lists
+        from data_preprocessing import DataPreprocessor
+        preprocessor = DataPreprocessor()
+        feature_schema = FeatureSchema(preprocessor.numeric_features, preprocessor.categorical_features)
+    # Optional pure-Python scorer with the preprocessing folded into the coefficients
+    scorer = CompiledScorer.from_pipeline(ml_model) if fast_path else None
+    return ModelState(ml_model, feature_schema, scorer, version)
+
+
+def scorer_state(scorer, version):
+    """ModelState for a bare CompiledScorer, which also serves as the model (it has predict_proba)."""
+    schema = FeatureSchema(scorer.numeric_features, scorer.categorical_weights)
+    return ModelState(scorer, schema, scorer, version)
+
+
+def _predict_pds(state, applicants):
+    """PDs for a DataFrame straight from a ModelState, outside any system (no PD cache, no metrics)."""
+    df = applicants[list(state.feature_schema.columns)]
+    if state.scorer is not None:
+        return state.scorer.predict_pd_batch(df)
+    return np.asarray(state.ml_model.predict_proba(df))[:, 1]
+
+
+class ModelWatcher:
+    """Hot-reloads a LoanDecisionSystem when its model artifact changes on disk.
+
+    Each poll is a cheap stat(); the file is only hashed and loaded when its
+    size or mtime moved. A candidate model is rejected (and the live one kept)
+    if it fails to load, scores the golden set with missing or out-of-range
+    PDs, needs different input columns, or moves the golden set's PDs by more
+    than max_mean_shift on average.
+    """
+    def __init__(self, system, model_path, golden_set, interval=5.0, max_mean_shift=0.05):
+        self.system = system
+        self.model_path = model_path
+        self.golden_set = golden_set
+        self.interval = interval
+        self.max_mean_shift = max_mean_shift
+        self.swaps = 0
+        self.rejections = 0
+        self.last_error = None
+        self._stat = self._file_stat()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _file_stat(self):
+        try:
+            stat = os.stat(self.model_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="model-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check_now()
+
+    def check_now(self):
+        """Polls the artifact once. Returns True if a new model was swapped in."""
+        stat = self._file_stat()
+        if stat is None or stat == self._stat:
+            return False
+        self._stat = stat
+        try:
+            candidate = load_model_state(self.model_path, self.system.fast_path)
+            if candidate.version == self.system.model_version:
+                # Touched but not changed
+                return False
+            self.validate(candidate)
+        except Exception as e:
+            # Half-written file, bad model, failed validation: keep serving the live model
+            self.rejections += 1
+            self.last_error = str(e)
+            print(f"Model reload rejected: {e}")
+            return False
+        self.system.swap_model(candidate)
+        self.swaps += 1
+        self.last_error = None
+        print(f"Model reloaded, version {candidate.version}")
+        return True
+
+    def validate(self, candidate):
+        """Scores the golden set with the candidate (which also warms it up), raises ValueError if unfit."""
+        live = self.system.model
+        if set(candidate.feature_schema.columns) != set(live.feature_schema.columns):
+            raise ValueError("new model expects different input columns")
+        # Scored outside the system, so validation doesn't show up in its metrics
+        new_pds = _predict_pds(candidate, self.golden_set)
+        # Also run the single-applicant path once so its first real call is warm
+        applicant = self.golden_set.iloc[0].to_dict()
+        if candidate.scorer is not None:
+            candidate.scorer.predict_pd(applicant)
+        else:
+            candidate.ml_model.predict_proba(candidate.feature_schema.frame([applicant]))
+        if len(new_pds) != len(self.golden_set) or not np.all(np.isfinite(new_pds)):
+            raise ValueError("new model produced missing PDs on the golden set")
+        if np.any((new_pds < 0) | (new_pds > 1)):
+            raise ValueError("new model produced PDs outside [0, 1] on the golden set")
+        if self.max_mean_shift is not None:
+            live_pds = _predict_pds(live, self.golden_set)
+            shift = float(np.mean(np.abs(new_pds - live_pds)))
+            if shift > self.max_mean_shift:
+                raise ValueError(f"golden set PDs moved by {shift:.4f} on average (limit {self.max_mean_shift})")
+
+
+if __name__ == "__main__":
+    import pandas as pd
+    from descision_system import LoanDecisionSystem
+
+    MODEL_PATH = "models/logistic_regression_model.joblib"
+    golden = pd.read_csv("data/loan_applications.csv", sep="\t").drop(columns=["default_12m"]).head(500)
+    system = LoanDecisionSystem(MODEL_PATH)
+    watcher = ModelWatcher(system, MODEL_PATH, golden, interval=2.0).start()
+    print(f"Watching {MODEL_PATH} (version {system.model_version}), Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        watcher.stop()
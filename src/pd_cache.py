@@ -0,0 +1,83 @@
+import hashlib
+import json
+import numbers
+import threading
+import time
+from collections import OrderedDict
+
+
+class PDCache:
+    """LRU cache of predicted PDs with a time-to-live.
+
+    Keys are a canonical hash of the applicant's feature values plus the model
+    version, so a new model never reuses old PDs. Only PDs are cached, rules
+    are always re-applied with the current parameters. Safe to share between
+    threads, every operation holds one lock for a few dict operations.
+    """
+    def __init__(self, maxsize=10_000, ttl=3600.0, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        # key -> (pd_value, expires_at), oldest first
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def make_key(applicant_data, model_version, columns=None):
+        """Canonical key: same feature values give the same key whatever the dict order or int/float type."""
+        columns = sorted(applicant_data) if columns is None else columns
+        values = []
+        for col in columns:
+            value = applicant_data[col]
+            # 30 and 30.0 (or numpy ints) score the same, so hash them the same
+            if isinstance(value, numbers.Number) and not isinstance(value, bool):
+                value = float(value)
+            else:
+                value = str(value)
+            values.append([col, value])
+        canonical = json.dumps([model_version, values], separators=(",", ":"))
+        return hashlib.blake2b(canonical.encode(), digest_size=16).hexdigest()
+
+    def get(self, key):
+        """Cached PD for key, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            pd_value, expires_at = entry
+            if expires_at <= self.clock():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return pd_value
+
+    def put(self, key, pd_value):
+        with self._lock:
+            self._entries[key] = (pd_value, self.clock() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drops every entry, e.g. after a new model is loaded."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
@@ -1,73 +1,117 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from rule_set import ALL_CRITERIA_MET, RuleSet  # noqa: F401 (ALL_CRITERIA_MET re-exported)
+
+_DEFAULT_RULE_SET = RuleSet.default()
+# Rejection reasons of the default rules in the order apply_rules reports them; bit i of a reason mask is REASONS[i]
+REASONS = _DEFAULT_RULE_SET.reasons
+REASON_FLAGS = tuple(np.uint16(1 << i) for i in range(len(REASONS)))
+
+
+def decode_reasons(mask):
+    """Turns a reason bitmask of the default rules back into the list of reason strings."""
+    return _DEFAULT_RULE_SET.decode(mask)
+
+
+def decisions_frame(masks, predicted_pds, index=None, decode=decode_reasons):
+    """Decision/Reasons/Predicted_PD DataFrame from evaluate_batch reason masks.
+
+    decode turns one mask into reasons, pass the RuleSet.decode of the rules that made the masks.
+    """
+    # Only decode each distinct mask once, there are at most 2**len(reasons) of them
+    unique_masks, inverse = np.unique(masks, return_inverse=True)
+    decoded = [decode(mask) for mask in unique_masks]
+
+    return pd.DataFrame({
+        "Decision": np.where(masks != 0, "Rejected", "Approved"),
+        "Reasons": [list(decoded[i]) for i in inverse],
+        "Predicted_PD": np.asarray(predicted_pds, dtype=float),
+    }, index=index)
+
+
+def _threshold(name):
+    # Read-only view of one rule's threshold in the current rule set
+    return property(lambda self: self.rule_set.threshold(name), doc=f"Threshold of the {name} rule.")
+
+
 class RuleEngine:
     """This clase implements the rule-based engine to assess credit risk. 
+    The rules themselves live in a RuleSet (see rule_set.py); the engine holds
+    the current one and swaps it whole when the rules change. Reading the rules
+    takes no lock (one attribute read gives a consistent snapshot); updates are
+    serialised by a writer lock so concurrent update_rules calls don't lose each other.
     Parameters:
     - pd_threshold: Probability of default threshold.
+    - the other keyword arguments override the default rule thresholds of the same name
+    - rule_set: RuleSet to start from instead of the default rules (e.g. RuleSet.load(path))
     """
-    def __init__(self, pd_threshold=0.10, min_age=18, max_age=75, min_income=15000, min_employment_length=1, min_credit_score = 650, debt_to_income_ratio=0.35, max_delinquencies_2y=1):
-        self.pd_threshold = pd_threshold
-        self.min_age = min_age
-        self.max_age = max_age
-        self.min_income = min_income
-        self.min_employment_length = min_employment_length
-        self.min_credit_score = min_credit_score
-        self.debt_to_income_ratio = debt_to_income_ratio
-        self.max_delinquencies_2y = max_delinquencies_2y
-        
-        
+    pd_threshold = _threshold("pd_threshold")
+    min_age = _threshold("min_age")
+    max_age = _threshold("max_age")
+    min_income = _threshold("min_income")
+    min_employment_length = _threshold("min_employment_length")
+    min_credit_score = _threshold("min_credit_score")
+    debt_to_income_ratio = _threshold("debt_to_income_ratio")
+    max_delinquencies_2y = _threshold("max_delinquencies_2y")
+
+    def __init__(self, pd_threshold=None, min_age=None, max_age=None, min_income=None, min_employment_length=None, min_credit_score=None, debt_to_income_ratio=None, max_delinquencies_2y=None, rule_set=None):
+        overrides = {name: value for name, value in [
+            ("pd_threshold", pd_threshold), ("min_age", min_age), ("max_age", max_age),
+            ("min_income", min_income), ("min_employment_length", min_employment_length),
+            ("min_credit_score", min_credit_score), ("debt_to_income_ratio", debt_to_income_ratio),
+            ("max_delinquencies_2y", max_delinquencies_2y)] if value is not None}
+        rule_set = rule_set or _DEFAULT_RULE_SET
+        self.rule_set = rule_set.with_thresholds(**overrides) if overrides else rule_set
+        self._write_lock = threading.Lock()
+
+    @property
+    def version(self):
+        return self.rule_set.version
+
     def apply_rules(self, applicant_data, predicted_pd):
         """Setting the rules for credit risk assessment."""
+        # One read of the current rules, a concurrent update_rules cannot mix old and new thresholds
+        return self.rule_set.apply(applicant_data, predicted_pd)
+
+    def is_approved(self, applicant_data, predicted_pd):
+        """Decision only, stops at the first rule that rejects."""
+        return self.rule_set.is_approved(applicant_data, predicted_pd)
+
+    def evaluate_batch(self, applicants, predicted_pds):
+        """Vectorised rule evaluation over columns (DataFrame or dict of arrays).
+
+        Returns one bitmask per applicant (uint16 for up to 16 reasons), bit i set
+        when rule_set.reasons[i] applies. A mask of 0 means approved; use
+        rule_set.decode (decode_reasons for the default rules) for the text.
+        """
+        return self.rule_set.evaluate_batch(applicants, predicted_pds)
+
+    def apply_rules_batch(self, applicants, predicted_pds):
+        """Applies the rules to a DataFrame of applicants at once.
+
+        Returns a DataFrame (same index as applicants) with the same
+        Decision/Reasons/Predicted_PD values apply_rules gives per row.
+        """
+        rules = self.rule_set
+        predicted_pds = np.asarray(predicted_pds, dtype=float)
+        masks = rules.evaluate_batch(applicants, predicted_pds)
+        return decisions_frame(masks, predicted_pds, applicants.index, rules.decode)
+
+    def update_rules(self, **thresholds):
+        """Update rule thresholds by rule name (e.g. min_credit_score=600); None leaves a rule as it is.
+
+        Builds a new RuleSet and swaps it in with one assignment.
+        """
+        thresholds = {name: value for name, value in thresholds.items() if value is not None}
+        if thresholds:
+            # Read-modify-write, so writers take turns; readers never wait
+            with self._write_lock:
+                self.rule_set = self.rule_set.with_thresholds(**thresholds)
 
-        reasons = []
-        decision = "Approved"
-
-        if predicted_pd >= self.pd_threshold:
-            decision = "Rejected"
-            reasons.append("High Probability of Default")
-
-        if applicant_data.get("annual_income") < self.min_income:
-            decision = "Rejected"
-            reasons.append("Annual Income Too Low")
-
-        if applicant_data.get("age") < self.min_age or applicant_data.get("age") > self.max_age:
-            decision = "Rejected"
-            reasons.append("Age Out of Range")
-
-        if applicant_data.get("employment_length") < self.min_employment_length:
-            decision = "Rejected"
-            reasons.append("Insufficient Employment Length")
-
-        if applicant_data.get("credit_score") < self.min_credit_score:
-            decision = "Rejected"
-            reasons.append("Low Credit Score")
-
-        if applicant_data.get("debt_to_income") > self.debt_to_income_ratio:
-            decision = "Rejected"
-            reasons.append("High Debt-to-Income Ratio")
-
-        if applicant_data.get("delinquencies_2y") > self.max_delinquencies_2y:
-            decision = "Rejected"
-            reasons.append("Excessive Recent Delinquencies")
-
-        if not reasons:
-            reasons.append("All criteria met")
-
-        return {"Decision": decision, "Reasons": reasons, "Predicted_PD": predicted_pd}
-    
-    def update_rules(self, pd_threshold=None, min_age=None, max_age=None, min_income=None, min_employment_length=None, min_credit_score=None, debt_to_income_ratio=None, max_delinquencies_2y=None):
-        """Update the rule parameters dynamically."""
-        if pd_threshold is not None:
-            self.pd_threshold = pd_threshold
-        if min_age is not None:
-            self.min_age = min_age
-        if max_age is not None:
-            self.max_age = max_age
-        if min_income is not None:
-            self.min_income = min_income
-        if min_employment_length is not None:
-            self.min_employment_length = min_employment_length
-        if min_credit_score is not None:
-            self.min_credit_score = min_credit_score
-        if debt_to_income_ratio is not None:
-            self.debt_to_income_ratio = debt_to_income_ratio
-        if max_delinquencies_2y is not None:
-            self.max_delinquencies_2y = max_delinquencies_2y
\ No newline at end of file
+    def set_rule_set(self, rule_set):
+        """Swaps in a whole new rule set, e.g. RuleSet.load of an edited config."""
+        with self._write_lock:
+            self.rule_set = rule_set
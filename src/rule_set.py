@@ -0,0 +1,253 @@
+"""
+Declarative credit policy rules, compiled once per version.
+
+A rule rejects an applicant when `field <op> threshold` holds, e.g.
+{"name": "min_credit_score", "field": "credit_score", "op": "<",
+ "threshold": 650, "reason": "Low Credit Score", "priority": 4}.
+The field "predicted_pd" is the model's PD rather than an applicant field.
+Rules sharing a reason (min_age/max_age) share its reason bit; reasons are
+reported in priority order.
+
+A RuleSet is never changed after it is built. Changing a threshold makes a
+new RuleSet with a new version, which the RuleEngine swaps in with one
+assignment, so a decision in flight finishes with the rules it started with.
+
+On construction the rules are compiled into:
+- evaluate(applicant, pd) / apply(applicant, pd): generated Python for the
+  single-applicant path, each field fetched once, returning the reason
+  bitmask or the apply_rules result dict
+- is_approved(applicant, pd): the same checks in decision_order (most
+  rejecting first, see ordered_by_rejections), stopping at the first failure
+- evaluate_batch / approve_batch: the column-wise versions
+"""
+import hashlib
+import json
+import numbers
+import operator
+from dataclasses import asdict, dataclass, replace
+
+import numpy as np
+
+PD_FIELD = "predicted_pd"
+ALL_CRITERIA_MET = "All criteria met"
+OPERATORS = {"<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge,
+             "==": operator.eq, "!=": operator.ne}
+
+DEFAULT_RULES = (
+    {"name": "pd_threshold", "field": PD_FIELD, "op": ">=", "threshold": 0.10,
+     "reason": "High Probability of Default", "priority": 0},
+    {"name": "min_income", "field": "annual_income", "op": "<", "threshold": 15000,
+     "reason": "Annual Income Too Low", "priority": 1},
+    {"name": "min_age", "field": "age", "op": "<", "threshold": 18,
+     "reason": "Age Out of Range", "priority": 2},
+    {"name": "max_age", "field": "age", "op": ">", "threshold": 75,
+     "reason": "Age Out of Range", "priority": 2},
+    {"name": "min_employment_length", "field": "employment_length", "op": "<", "threshold": 1,
+     "reason": "Insufficient Employment Length", "priority": 3},
+    {"name": "min_credit_score", "field": "credit_score", "op": "<", "threshold": 650,
+     "reason": "Low Credit Score", "priority": 4},
+    {"name": "debt_to_income_ratio", "field": "debt_to_income", "op": ">", "threshold": 0.35,
+     "reason": "High Debt-to-Income Ratio", "priority": 5},
+    {"name": "max_delinquencies_2y", "field": "delinquencies_2y", "op": ">", "threshold": 1,
+     "reason": "Excessive Recent Delinquencies", "priority": 6},
+)
+
+
+@dataclass(frozen=True)
+class Rule:
+    """Rejects with `reason` when the applicant's `field` <op> `threshold`."""
+    name: str
+    field: str
+    op: str
+    threshold: float
+    reason: str
+    priority: int = 0
+
+    def __post_init__(self):
+        if self.op not in OPERATORS:
+            raise ValueError(f"Rule {self.name!r}: unknown operator {self.op!r}, expected one of {list(OPERATORS)}")
+
+
+def _compile(rules, groups, mode):
+    """Generates a single-applicant evaluator with the thresholds bound as constants.
+
+    groups: (reason index, rule indices) in checking order; the rules of a group
+    are or-ed into one check. mode is "mask" (returns the reason mask), "result"
+    (the apply_rules dict) or "decision" (True/False, returning at the first failure).
+    """
+    namespace = {"ALL_CRITERIA_MET": ALL_CRITERIA_MET}
+    lines = ["def evaluate(applicant, predicted_pd):", "    get = applicant.get"]
+    lines.append({"mask": "    mask = 0", "result": "    reasons = []", "decision": ""}[mode])
+    variables = {PD_FIELD: "predicted_pd"}
+    for reason, indices in groups:
+        conditions = []
+        for i in indices:
+            rule = rules[i]
+            if rule.field not in variables:
+                # Fetched once, right before its first check, so a short-circuit skips the lookup too
+                variables[rule.field] = f"v{len(variables)}"
+                lines.append(f"    {variables[rule.field]} = get({rule.field!r})")
+            namespace[f"t{i}"] = rule.threshold
+            # op is one of OPERATORS (checked in Rule), field names only appear as string literals
+            conditions.append(f"{variables[rule.field]} {rule.op} t{i}")
+        namespace[f"r{reason}"] = rules[indices[0]].reason
+        lines.append(f"    if {' or '.join(conditions)}:")
+        lines.append({"mask": f"        mask |= {1 << reason}", "result": f"        reasons.append(r{reason})",
+                      "decision": "        return False"}[mode])
+    lines += {
+        "mask": ["    return mask"],
+        "result": ["    if reasons:",
+                   "        return {'Decision': 'Rejected', 'Reasons': reasons, 'Predicted_PD': predicted_pd}",
+                   "    return {'Decision': 'Approved', 'Reasons': [ALL_CRITERIA_MET], 'Predicted_PD': predicted_pd}"],
+        "decision": ["    return True"],
+    }[mode]
+    exec("\n".join(lines), namespace)
+    return namespace["evaluate"]
+
+
+class RuleSet:
+    """An immutable, versioned list of rules with its compiled evaluators."""
+
+    def __init__(self, rules, version=None, decision_order=None):
+        rules = tuple(rule if isinstance(rule, Rule) else Rule(**rule) for rule in rules)
+        names = [rule.name for rule in rules]
+        if len(set(names)) != len(names):
+            raise ValueError("Rule names must be unique")
+        self.rules = tuple(sorted(rules, key=lambda rule: rule.priority))
+        self.reasons = tuple(dict.fromkeys(rule.reason for rule in self.rules))
+        if len(self.reasons) > 64:
+            raise ValueError("At most 64 distinct reasons fit in a reason mask")
+        self.mask_dtype = np.uint16 if len(self.reasons) <= 16 else np.uint64
+        self.version = version or self.content_hash()
+        # Bit i of a reason mask is reasons[i]
+        self._flags = [1 << self.reasons.index(rule.reason) for rule in self.rules]
+        self._index = {rule.name: i for i, rule in enumerate(self.rules)}
+        self._decoded = {}
+        self.decision_order = tuple(self._index[name] for name in decision_order) if decision_order \
+            else tuple(range(len(self.rules)))
+        # Full evaluation checks reason by reason (in report order), decision-only rule by rule in decision_order
+        by_reason = [(r, [i for i, rule in enumerate(self.rules) if rule.reason == reason])
+                     for r, reason in enumerate(self.reasons)]
+        by_rule = [(self.reasons.index(self.rules[i].reason), [i]) for i in self.decision_order]
+        self.evaluate = _compile(self.rules, by_reason, "mask")
+        self.apply = _compile(self.rules, by_reason, "result")
+        self.is_approved = _compile(self.rules, by_rule, "decision")
+
+    @classmethod
+    def default(cls):
+        return cls(DEFAULT_RULES)
+
+    @classmethod
+    def from_dict(cls, config):
+        return cls(config["rules"], config.get("version"), config.get("decision_order"))
+
+    @classmethod
+    def load(cls, path):
+        """Reads a JSON config: {"version": ..., "rules": [{name, field, op, threshold, reason, priority}, ...]}."""
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+    def to_dict(self):
+        return {"version": self.version, "rules": [asdict(rule) for rule in self.rules],
+                "decision_order": [self.rules[i].name for i in self.decision_order]}
+
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def content_hash(self):
+        """Short sha256 of the rules themselves, the version when the config does not name one."""
+        payload = json.dumps([asdict(rule) for rule in self.rules], sort_keys=True, default=float)
+        return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+    @property
+    def fields(self):
+        """Applicant fields the rules read."""
+        return tuple(dict.fromkeys(rule.field for rule in self.rules if rule.field != PD_FIELD))
+
+    def threshold(self, name):
+        return self.rules[self._index[name]].threshold
+
+    def thresholds(self):
+        return {rule.name: rule.threshold for rule in self.rules}
+
+    def with_thresholds(self, **thresholds):
+        """New RuleSet with some thresholds changed; this one is left as it is.
+
+        The new version is the content hash of the changed rules. Thresholds of
+        <, <=, > and >= rules must be numbers.
+        """
+        unknown = set(thresholds) - set(self._index)
+        if unknown:
+            raise ValueError(f"Unknown rules: {sorted(unknown)}")
+        for name, value in thresholds.items():
+            if self.rules[self._index[name]].op in ("<", "<=", ">", ">=") and \
+                    (isinstance(value, bool) or not isinstance(value, numbers.Real)):
+                raise TypeError(f"Threshold for {name!r} must be a number, got {value!r}")
+        rules = [replace(rule, threshold=thresholds[rule.name]) if rule.name in thresholds else rule
+                 for rule in self.rules]
+        return RuleSet(rules, decision_order=[self.rules[i].name for i in self.decision_order])
+
+    def decode(self, mask):
+        """Reason strings for a reason mask, in priority order (each distinct mask is decoded once)."""
+        mask = int(mask)
+        decoded = self._decoded.get(mask)
+        if decoded is None:
+            decoded = tuple(reason for i, reason in enumerate(self.reasons) if mask >> i & 1) \
+                or (ALL_CRITERIA_MET,)
+            self._decoded[mask] = decoded
+        return list(decoded)
+
+    def _failures(self, columns, predicted_pds, order):
+        """(rule index, boolean array of applicants the rule rejects), each column converted once."""
+        arrays = {PD_FIELD: np.asarray(predicted_pds, dtype=float)}
+        for i in order:
+            rule = self.rules[i]
+            if rule.field not in arrays:
+                arrays[rule.field] = np.asarray(columns[rule.field])
+            yield i, OPERATORS[rule.op](arrays[rule.field], rule.threshold)
+
+    def evaluate_batch(self, columns, predicted_pds):
+        """One reason mask per applicant over columns (DataFrame or dict of arrays); 0 means approved."""
+        masks = np.zeros(len(predicted_pds), dtype=self.mask_dtype)
+        for i, failed in self._failures(columns, predicted_pds, range(len(self.rules))):
+            np.bitwise_or(masks, self.mask_dtype(self._flags[i]), out=masks, where=failed)
+        return masks
+
+    def approve_batch(self, columns, predicted_pds):
+        """Decision only: boolean approved per applicant. Each rule in decision_order only
+        checks the applicants no earlier rule rejected."""
+        predicted_pds = np.asarray(predicted_pds, dtype=float)
+        approved = np.zeros(len(predicted_pds), dtype=bool)
+        remaining = np.arange(len(predicted_pds))
+        arrays = {PD_FIELD: predicted_pds}
+        for i in self.decision_order:
+            if not len(remaining):
+                break
+            rule = self.rules[i]
+            if rule.field not in arrays:
+                arrays[rule.field] = np.asarray(columns[rule.field])
+            remaining = remaining[~OPERATORS[rule.op](arrays[rule.field][remaining], rule.threshold)]
+        approved[remaining] = True
+        return approved
+
+    def rejection_rates(self, columns, predicted_pds):
+        """Share of applicants each rule rejects on its own, by rule name."""
+        return {self.rules[i].name: float(np.mean(failed))
+                for i, failed in self._failures(columns, predicted_pds, range(len(self.rules)))}
+
+    def ordered_by_rejections(self, columns, predicted_pds):
+        """Same rules and version, with decision_order set to the most rejecting rules first
+        (measured on a sample of applicants), so decision-only checks stop as early as possible."""
+        rates = self.rejection_rates(columns, predicted_pds)
+        order = sorted(rates, key=rates.get, reverse=True)
+        return RuleSet(self.rules, self.version, order)
+
+
+if __name__ == "__main__":
+    import sys
+
+    # Writes the default policy as a config to edit and load with RuleSet.load / RuleEngine(rule_set=...)
+    path = sys.argv[1] if len(sys.argv) > 1 else "rules.json"
+    RuleSet.default().save(path)
+    print(f"Wrote {len(DEFAULT_RULES)} rules (version {RuleSet.default().version}) to {path}")
@@ -0,0 +1,322 @@
+"""
+Asyncio HTTP/JSON scoring service in front of LoanDecisionSystem.
+
+Requests that arrive within a few milliseconds of each other are coalesced
+into one make_decisions call (one predict_proba over the batch), run in a
+worker thread so the event loop keeps accepting requests.
+
+Endpoints:
+- POST /score   body: one applicant object -> one decision,
+                or {"applicants": [...]} -> {"results": [...]}
+- GET  /health
+- GET  /metrics  Prometheus text, when the system was created with a DecisionMetrics
+"""
+import asyncio
+import json
+
+
+class MicroBatcher:
+    """Collects single-applicant requests into batches for score_batch(list of dicts) -> list of results."""
+
+    def __init__(self, score_batch, max_batch_size=256, max_wait_ms=2.0):
+        self.score_batch = score_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.batches_scored = 0
+        self._queue = None
+        self._task = None
+
+    def start(self):
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def submit(self, applicant):
+        """Queues one applicant and waits for its result."""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((applicant, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            # Block for the first request, then give others max_wait to join the batch
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await self._score(loop, batch)
+
+    async def _score(self, loop, batch):
+        applicants = [applicant for applicant, _ in batch]
+        try:
+            results = await loop.run_in_executor(None, self.score_batch, applicants)
+            outcomes = [(result, None) for result in results]
+        except Exception:
+            # One bad applicant should not fail the whole batch, so rescore one by one
+            outcomes = []
+            for applicant in applicants:
+                try:
+                    result = await loop.run_in_executor(None, self.score_batch, [applicant])
+                    outcomes.append((result[0], None))
+                except Exception as e:
+                    outcomes.append((None, e))
+        self.batches_scored += 1
+        for (_, future), (result, error) in zip(batch, outcomes):
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+
+def decisions_to_records(results):
+    """Turns the make_decisions DataFrame into JSON-ready dicts."""
+    return [
+        {"Decision": decision, "Reasons": list(reasons), "Predicted_PD": float(pd_value)}
+        for decision, reasons, pd_value in zip(results["Decision"], results["Reasons"], results["Predicted_PD"])
+    ]
+
+
+class ScoringService:
+    """HTTP server wrapping a LoanDecisionSystem (anything with make_decisions)."""
+
+    def __init__(self, system, host="127.0.0.1", port=8000, max_batch_size=256, max_wait_ms=2.0,
+                 max_body_bytes=1 << 20):
+        self.system = system
+        self.host = host
+        self.port = port
+        # Larger request bodies get 413 without being read
+        self.max_body_bytes = max_body_bytes
+        self.batcher = MicroBatcher(self._score_batch, max_batch_size, max_wait_ms)
+        self._server = None
+
+    def _score_batch(self, applicants):
+        return decisions_to_records(self.system.make_decisions(applicants))
+
+    async def start(self):
+        self.batcher.start()
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        # Port 0 picks a free port, report the real one
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        await self.batcher.stop()
+
+    async def serve_forever(self):
+        await self.start()
+        print(f"Scoring service listening on http://{self.host}:{self.port}")
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader, self.max_body_bytes)
+                except _BadRequest as e:
+                    # The rest of the stream can't be trusted, answer and close
+                    _write_response(writer, e.status, {"error": str(e)}, keep_alive=False)
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                method, path, headers, body = request
+                status, payload = await self._route(method, path, body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                _write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method, path, body):
+        if path == "/health" and method == "GET":
+            return 200, {"status": "ok", "batches_scored": self.batcher.batches_scored}
+        if path == "/metrics" and method == "GET":
+            metrics = getattr(self.system, "metrics", None)
+            if metrics is None:
+                return 404, {"error": "Metrics are not enabled"}
+            return 200, metrics.to_prometheus()
+        if path != "/score":
+            return 404, {"error": f"Unknown path {path}"}
+        if method != "POST":
+            return 405, {"error": "Use POST"}
+        try:
+            data = json.loads(body or b"null")
+        except ValueError:
+            return 400, {"error": "Body is not valid JSON"}
+
+        try:
+            if isinstance(data, dict) and "applicants" in data:
+                results = await asyncio.gather(*(self.batcher.submit(a) for a in data["applicants"]))
+                return 200, {"results": list(results)}
+            if isinstance(data, dict):
+                return 200, await self.batcher.submit(data)
+        except (KeyError, ValueError, TypeError) as e:
+            return 422, {"error": f"Could not score applicant: {e}"}
+        except Exception as e:
+            # Not the applicant's fault (e.g. the audit log failed), still answer
+            return 500, {"error": f"Scoring failed: {e}"}
+        return 400, {"error": "Expected an applicant object or {\"applicants\": [...]}"}
+
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Content Too Large", 422: "Unprocessable Entity", 500: "Internal Server Error"}
+
+
+class _BadRequest(Exception):
+    """A request that can't be parsed (400) or is too large (413)."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+async def _read_request(reader, max_body_bytes=1 << 20):
+    """Reads one HTTP/1.1 request, returns (method, path, headers, body) or None at EOF.
+
+    Raises _BadRequest for a malformed request line or Content-Length, or a body over max_body_bytes.
+    """
+    try:
+        request_line = await reader.readline()
+        if not request_line.strip():
+            return None
+        parts = request_line.decode("latin-1").split(" ", 2)
+        if len(parts) != 3:
+            raise _BadRequest(400, "Malformed request line")
+        method, path, _ = parts
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+    except ValueError:
+        # StreamReader's line limit (64 KiB) was exceeded
+        raise _BadRequest(400, "Request line or header too long") from None
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise _BadRequest(400, "Content-Length is not an integer") from None
+    if length < 0:
+        raise _BadRequest(400, "Content-Length is negative")
+    if length > max_body_bytes:
+        raise _BadRequest(413, f"Body is larger than {max_body_bytes} bytes")
+    body = await reader.readexactly(length) if length else b""
+    return method, path, headers, body
+
+
+def _write_response(writer, status, payload, keep_alive=True):
+    # Strings (the metrics page) go out as plain text, everything else as JSON
+    if isinstance(payload, str):
+        body, content_type = payload.encode(), "text/plain; version=0.0.4"
+    else:
+        body, content_type = json.dumps(payload).encode(), "application/json"
+    head = (
+        f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    writer.write(head.encode("latin-1") + body)
+
+
+class ScoringClient:
+    """Small asyncio client for the service, handy for tests and load checks in-process."""
+
+    def __init__(self, host="127.0.0.1", port=8000):
+        self.host = host
+        self.port = port
+
+    async def request(self, method, path, payload=None):
+        """Sends one request on a fresh connection, returns (status, decoded JSON or text)."""
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            body = json.dumps(payload).encode() if payload is not None else b""
+            head = (
+                f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+                "Connection: close\r\n\r\n"
+            )
+            writer.write(head.encode("latin-1") + body)
+            await writer.drain()
+            status_line = await reader.readline()
+            status = int(status_line.split()[1])
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            body = await reader.readexactly(int(headers.get("content-length", 0)))
+            if headers.get("content-type", "").startswith("application/json"):
+                return status, json.loads(body)
+            return status, body.decode()
+        finally:
+            writer.close()
+
+    async def score(self, applicant):
+        return await self.request("POST", "/score", applicant)
+
+
+if __name__ == "__main__":
+    import argparse
+    from descision_system import LoanDecisionSystem
+
+    parser = argparse.ArgumentParser(description="Run the loan scoring HTTP service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--model", default="models/logistic_regression_model.joblib")
+    parser.add_argument("--max-batch-size", type=int, default=256)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    parser.add_argument("--metrics", action="store_true", help="record stage timings and serve GET /metrics")
+    parser.add_argument("--watch", type=float, default=None, metavar="SECONDS",
+                        help="poll the model file and hot-reload it when it changes")
+    parser.add_argument("--max-body-kb", type=int, default=1024, help="larger request bodies get 413")
+    args = parser.parse_args()
+
+    metrics = None
+    if args.metrics:
+        from metrics import DecisionMetrics
+        metrics = DecisionMetrics()
+    system = LoanDecisionSystem(args.model, fast_path=True, metrics=metrics)
+    watcher = None
+    if args.watch:
+        import pandas as pd
+        from model_registry import ModelWatcher
+        golden = pd.read_csv("data/loan_applications.csv", sep="\t").drop(columns=["default_12m"]).head(500)
+        watcher = ModelWatcher(system, args.model, golden, interval=args.watch).start()
+    service = ScoringService(system, args.host, args.port, args.max_batch_size, args.max_wait_ms,
+                             args.max_body_kb * 1024)
+    try:
+        asyncio.run(service.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if watcher is not None:
+            watcher.stop()
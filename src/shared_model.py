@@ -0,0 +1,144 @@
+"""
+Compiled model shared between processes through a memory-mapped segment.
+
+A segment is one file: a JSON header (feature names, category vocabularies,
+offsets) followed by every coefficient as a float64 array. Workers map the
+array read-only, so all of them read the same physical pages (under /dev/shm
+the file never touches disk) and attaching costs no unpickling at all.
+
+New versions are published as new segment files. A CURRENT file holding the
+active segment's name is then swapped atomically with os.replace, so readers
+see either the old model or the new one, never a mix.
+"""
+import hashlib
+import json
+import os
+import struct
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from compiled_scorer import CompiledScorer
+
+MAGIC = b"LOANSEG1"
+# Start of the float64 array, aligned for the memory map
+_ALIGN = 64
+
+
+def default_directory():
+    """Shared-memory directory when the OS has one, otherwise the temp dir."""
+    base = Path("/dev/shm") if Path("/dev/shm").is_dir() else Path(tempfile.gettempdir())
+    return base / "loan-decision-model"
+
+
+def publish(scorer, directory=None, version=None, keep=2):
+    """Writes scorer as a new segment and makes it the current one. Returns the segment version."""
+    directory = Path(directory) if directory is not None else default_directory()
+    directory.mkdir(parents=True, exist_ok=True)
+
+    arrays = [np.array([scorer.intercept]), scorer.numeric_weights]
+    categorical = []
+    offset = 1 + len(scorer.numeric_weights)
+    for name, weights in scorer.categorical_weights.items():
+        categorical.append({"name": name, "values": list(weights), "offset": offset, "length": len(weights)})
+        arrays.append(np.fromiter(weights.values(), dtype=np.float64, count=len(weights)))
+        offset += len(weights)
+    data = np.concatenate(arrays).astype(np.float64)
+
+    header = {"numeric_features": list(scorer.numeric_features), "categorical": categorical}
+    if version is None:
+        version = hashlib.sha256(json.dumps(header).encode() + data.tobytes()).hexdigest()[:16]
+    header["version"] = version
+    header_bytes = json.dumps(header).encode()
+    data_offset = -(-(len(MAGIC) + 8 + len(header_bytes)) // _ALIGN) * _ALIGN
+
+    segment = directory / f"segment-{version}.bin"
+    if not segment.exists():
+        tmp = directory / f".{segment.name}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(MAGIC + struct.pack("<Q", len(header_bytes)) + header_bytes)
+            f.write(b"\0" * (data_offset - f.tell()))
+            f.write(data.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, segment)
+
+    # Atomic switch, readers pick up the new segment on their next refresh
+    pointer_tmp = directory / ".CURRENT.tmp"
+    pointer_tmp.write_text(segment.name)
+    os.replace(pointer_tmp, directory / "CURRENT")
+    _remove_old_segments(directory, keep)
+    return version
+
+
+def _remove_old_segments(directory, keep):
+    # Unlinking is safe for processes that still have an old segment mapped
+    segments = sorted(directory.glob("segment-*.bin"), key=lambda p: p.stat().st_mtime_ns, reverse=True)
+    current = (directory / "CURRENT").read_text()
+    for old in [s for s in segments if s.name != current][max(keep - 1, 0):]:
+        try:
+            old.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class SharedModel:
+    """Read-only view of the current segment in a directory, with .scorer ready to use."""
+
+    def __init__(self, directory=None):
+        self.directory = Path(directory) if directory is not None else default_directory()
+        self.segment_name = None
+        self.version = None
+        self.scorer = None
+        if not self.refresh():
+            raise FileNotFoundError(f"No shared model published in {self.directory}")
+
+    @staticmethod
+    def is_shared_model_dir(path):
+        return (Path(path) / "CURRENT").is_file()
+
+    def refresh(self):
+        """Attaches to the current segment if it changed since last time. Returns True on a switch."""
+        try:
+            segment_name = (self.directory / "CURRENT").read_text().strip()
+        except FileNotFoundError:
+            return False
+        if segment_name == self.segment_name:
+            return False
+        self.scorer, self.version = _map_segment(self.directory / segment_name)
+        self.segment_name = segment_name
+        return True
+
+
+def _map_segment(path):
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a model segment")
+        (header_length,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(header_length))
+    data_offset = -(-(len(MAGIC) + 8 + header_length) // _ALIGN) * _ALIGN
+    data = np.memmap(path, dtype=np.float64, mode="r", offset=data_offset)
+
+    n_numeric = len(header["numeric_features"])
+    categorical_weights = {
+        table["name"]: dict(zip(table["values"], data[table["offset"]:table["offset"] + table["length"]].tolist()))
+        for table in header["categorical"]
+    }
+    # numeric_weights stays a view on the mapped pages
+    scorer = CompiledScorer(float(data[0]), header["numeric_features"], data[1:1 + n_numeric], categorical_weights)
+    return scorer, header["version"]
+
+
+if __name__ == "__main__":
+    import argparse
+    import joblib
+
+    parser = argparse.ArgumentParser(description="Publish a trained pipeline as a shared model segment.")
+    parser.add_argument("--model", default="models/logistic_regression_model.joblib")
+    parser.add_argument("--directory", default=None, help=f"segment directory (default: {default_directory()})")
+    args = parser.parse_args()
+
+    scorer = CompiledScorer.from_pipeline(joblib.load(args.model))
+    version = publish(scorer, args.directory)
+    print(f"Published model version {version} to {args.directory or default_directory()}")
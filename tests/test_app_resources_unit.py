@@ -0,0 +1,64 @@
+"""
+Unit tests for the Streamlit app's batch scoring helper
+"""
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+pytest.importorskip("streamlit")
+from app_resources import MODEL_PATH, LoanDecisionSystem, score_frame  # noqa: E402
+from metrics import DecisionMetrics  # noqa: E402
+
+
+def test_score_frame_matches_make_decisions_and_reports_progress():
+    """
+    Chunked scoring gives the same decisions as one make_decisions call, with a progress callback per chunk
+    """
+    data = pd.read_csv(PROJECT_ROOT / "data" / "loan_applications.csv", sep="\t").head(250)
+    system = LoanDecisionSystem(str(PROJECT_ROOT / MODEL_PATH))
+    progress = []
+
+    results = score_frame(system, data, chunk_size=100, on_progress=lambda done, total: progress.append((done, total)))
+
+    expected = system.make_decisions(data)
+    assert progress == [(100, 250), (200, 250), (250, 250)]
+    assert list(results.columns[:len(data.columns)]) == list(data.columns)
+    assert (results["Decision"] == expected["Decision"]).all()
+    assert list(results["Reasons"]) == ["; ".join(reasons) for reasons in expected["Reasons"]]
+    assert results["Predicted_PD"].to_numpy() == pytest.approx(expected["Predicted_PD"].to_numpy())
+
+
+def test_score_frame_goes_through_make_decisions():
+    """
+    Every chunk is scored by make_decisions, so the system's metrics count all rows
+    """
+    data = pd.read_csv(PROJECT_ROOT / "data" / "loan_applications.csv", sep="\t").head(250)
+    metrics = DecisionMetrics()
+    system = LoanDecisionSystem(str(PROJECT_ROOT / MODEL_PATH), metrics=metrics)
+
+    results = score_frame(system, data, chunk_size=100)
+
+    assert sum(metrics.decisions.values()) == 250
+    assert metrics.decisions.get("Approved", 0) == int((results["Decision"] == "Approved").sum())
+    assert len(score_frame(system, data.head(0))) == 0
+
+
+@pytest.mark.parametrize("script", ["main.py", "pages/1_Batch_Scoring.py"])
+def test_app_scripts_run_from_a_fresh_interpreter(script):
+    """
+    Each app script imports and renders with only the project root on sys.path, as under streamlit run
+    """
+    import subprocess
+    code = (
+        "from streamlit.testing.v1 import AppTest\n"
+        f"app = AppTest.from_file({script!r}, default_timeout=60).run()\n"
+        "assert not app.exception, [e.message for e in app.exception]\n"
+    )
+    result = subprocess.run([sys.executable, "-W", "ignore", "-c", code], cwd=PROJECT_ROOT,
+                            capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,231 @@
+"""
+Unit tests for the append-only decision audit log
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = PROJECT_ROOT / "src"
+sys.path.append(str(SRC_DIR))
+
+from src.audit_log import AuditLog  # noqa: E402
+from src.descision_system import LoanDecisionSystem  # noqa: E402
+
+MODEL_PATH = str(PROJECT_ROOT / "models" / "logistic_regression_model.joblib")
+
+
+def _applicants(n):
+    data = pd.read_csv(PROJECT_ROOT / "data" / "loan_applications.csv", sep="\t").head(n)
+    return data.drop(columns=["default_12m"]).assign(applicant_id=[f"A{i}" for i in range(n)])
+
+
+def test_system_logs_single_and_batch_decisions(tmp_path):
+    """
+    Every decision is logged with its inputs and the model and rule-set versions, findable by id and time
+    """
+    applicants = _applicants(40)
+    audit = AuditLog(tmp_path).start()
+    system = LoanDecisionSystem(MODEL_PATH, audit_log=audit)
+    started = time.time()
+
+    single = system.make_decision(applicants.iloc[0].to_dict())
+    system.update_rule_parameters(pd_threshold=0.5)
+    batch = system.make_decisions(applicants)
+    audit.flush()
+
+    first, second = audit.find("A0")
+    assert first["decision"] == single["Decision"] and first["reasons"] == single["Reasons"]
+    assert first["input"] == applicants.iloc[0].to_dict()
+    assert first["model"] == second["model"] == system.model_version
+    # The rule change between the two calls shows up as a new rule-set version
+    assert first["rules"] != second["rules"] == system.rule_engine.version
+    assert second["decision"] == batch.loc[0, "Decision"]
+    assert audit.find("A39")[0]["pd"] == batch.loc[39, "Predicted_PD"]
+
+    assert len(audit.between(started, time.time())) == 41
+
+    # Compact results are logged the same way
+    compact = system.make_decision_results(applicants.head(3))
+    audit.flush()
+    assert len(audit.find("A2")) == 2
+    assert audit.find("A2")[-1]["decision"] == compact.to_frame()["Decision"].iloc[2]
+    assert audit.between(time.time() + 60, time.time() + 120) == []
+    audit.stop()
+
+
+def test_segments_rotate_and_index_survives_reopening(tmp_path):
+    """
+    Small segments roll over, and a reopened log finds everything, cutting off a line torn by a crash
+    """
+    applicants = _applicants(60)
+    audit = AuditLog(tmp_path, segment_bytes=4_000, batch_size=10).start()
+    system = LoanDecisionSystem(MODEL_PATH, audit_log=audit)
+    for applicant in applicants.to_dict("records"):
+        system.make_decision(applicant)
+    audit.stop()
+
+    segments = sorted(tmp_path.glob("audit-*.jsonl"))
+    assert len(segments) > 2
+    assert len(list(tmp_path.glob("audit-*.idx.json"))) == len(segments)
+
+    reopened = AuditLog(tmp_path)
+    assert [entry["input"]["applicant_id"] for entry in reopened.between(0, time.time())] == list(applicants["applicant_id"])
+    assert reopened.find("A42")[0]["input"] == applicants.iloc[42].to_dict()
+
+    # Crash mid-write: half a line at the end and an out-of-date index
+    with open(segments[-1], "ab") as f:
+        f.write(b'{"ts": 1')
+    recovered = AuditLog(tmp_path)
+    assert len(recovered.between(0, time.time())) == 60
+    assert segments[-1].read_bytes().endswith(b"\n")
+
+
+def test_full_queue_blocks_or_drops(tmp_path):
+    """
+    With the writer behind, record() waits for space by default, or drops and counts with on_full="drop"
+    """
+    applicant = _applicants(1).iloc[0].to_dict()
+    result = {"Decision": "Approved", "Reasons": ["All criteria met"], "Predicted_PD": 0.05}
+
+    dropping = AuditLog(tmp_path / "drop", max_queue=5, on_full="drop")
+    for _ in range(8):
+        dropping.record(applicant, result, "m", "r")
+    assert dropping.dropped == 3
+    dropping.start()
+    dropping.stop()
+    assert dropping.written == 5
+
+    # A writer held up on its first record
+    blocking = AuditLog(tmp_path / "block", max_queue=5, batch_size=1)
+    gate = threading.Event()
+    write = blocking._write
+    blocking._write = lambda items: (gate.wait(), write(items))
+    blocking.start()
+    producer = threading.Thread(target=lambda: [blocking.record(applicant, result, "m", "r") for _ in range(8)])
+    producer.start()
+    producer.join(0.2)
+    assert producer.is_alive()  # waiting for the writer
+    gate.set()
+    producer.join(5)
+    blocking.stop()
+    assert not producer.is_alive() and blocking.written == 8 and blocking.dropped == 0
+
+    # Never started: a full queue raises instead of waiting forever
+    unstarted = AuditLog(tmp_path / "unstarted", max_queue=5)
+    for _ in range(5):
+        unstarted.record(applicant, result, "m", "r")
+    with pytest.raises(RuntimeError):
+        unstarted.record(applicant, result, "m", "r")
+
+
+class _FullDisk:
+    """Segment file stand-in that writes a few bytes and then fails like a full disk."""
+
+    def __init__(self, file):
+        self.file = file
+
+    def write(self, data):
+        self.file.write(data[:10])
+        self.file.flush()
+        raise OSError(28, "No space left on device")
+
+    def close(self):
+        self.file.close()
+
+
+def test_writer_survives_failures_and_reports_them(tmp_path):
+    """
+    A bad record or a failed write is counted and raised by flush(), the writer keeps going,
+    and a stopped writer makes flush() raise instead of waiting forever
+    """
+    applicant = _applicants(1).iloc[0].to_dict()
+    result = {"Decision": "Approved", "Reasons": ["All criteria met"], "Predicted_PD": 0.05}
+    audit = AuditLog(tmp_path).start()
+
+    loop = []
+    loop.append(loop)
+    audit.record(dict(applicant, notes=loop), result, "m", "r")  # can't be encoded
+    audit.record(applicant, result, "m", "r")
+    with pytest.raises(RuntimeError):
+        audit.flush()
+    assert audit.failed == 1 and audit.written == 1
+
+    audit._file = _FullDisk(audit._file)
+    audit.record(applicant, result, "m", "r")
+    with pytest.raises(RuntimeError):
+        audit.flush()
+    assert audit.failed == 2
+    audit.record(applicant, result, "m", "r")
+    assert audit.flush() and audit.written == 2
+    audit.stop()
+
+    # The torn write was cut off: the segment holds exactly the two good lines
+    assert len(AuditLog(tmp_path).between(0, time.time())) == 2
+
+    # A bad record and a failed write in the same batch: each record counted once
+    same_batch = AuditLog(tmp_path / "same")
+    same_batch.record(dict(applicant, notes=loop), result, "m", "r")
+    same_batch.record(applicant, result, "m", "r")
+    same_batch.record(applicant, result, "m", "r")
+    same_batch._file = _FullDisk(open(same_batch._segment_path(1), "ab"))
+    same_batch.start()
+    with pytest.raises(RuntimeError):
+        same_batch.flush()
+    assert same_batch.failed == 3 and same_batch.written == 0
+    same_batch.stop()
+    with pytest.raises(RuntimeError):
+        audit.flush()
+    full = AuditLog(tmp_path / "full", max_queue=1).start()
+    full.stop()
+    full.record(applicant, result, "m", "r")
+    with pytest.raises(RuntimeError):
+        full.record(applicant, result, "m", "r")
+
+
+def test_batches_are_logged_as_decided(tmp_path):
+    """
+    Changing the applicants or results frames after make_decisions does not change what is logged
+    """
+    applicants = _applicants(5)
+    audit = AuditLog(tmp_path)
+    system = LoanDecisionSystem(MODEL_PATH, audit_log=audit)
+    batch = system.make_decisions(applicants)
+    expected_income, expected_reasons = applicants.loc[2, "annual_income"], list(batch.loc[2, "Reasons"])
+
+    applicants.loc[2, "annual_income"] = -1
+    batch.loc[2, "Decision"] = "Overridden"
+    batch.loc[2, "Reasons"].append("Edited")
+    audit.start()
+    audit.flush()
+
+    (entry,) = audit.find("A2")
+    assert entry["input"]["annual_income"] == expected_income
+    assert entry["decision"] != "Overridden" and entry["reasons"] == expected_reasons
+    audit.stop()
+
+
+def test_single_decisions_are_logged_as_decided(tmp_path):
+    """
+    Changing the result dict returned by make_decision does not change what is logged
+    """
+    applicant = _applicants(1).iloc[0].to_dict()
+    audit = AuditLog(tmp_path)
+    system = LoanDecisionSystem(MODEL_PATH, audit_log=audit)
+    result = system.make_decision(applicant)
+    expected = dict(result, Reasons=list(result["Reasons"]))
+
+    result["Decision"] = "Overridden"
+    result["Reasons"].append("Edited")
+    audit.start()
+    audit.flush()
+
+    (entry,) = audit.find("A0")
+    assert entry["decision"] == expected["Decision"] and entry["reasons"] == expected["Reasons"]
+    audit.stop()
+    with pytest.raises(KeyError):
+        audit.record(applicant, {"Decision": "Approved"}, "m", "r")  # no Predicted_PD
@@ -0,0 +1,78 @@
+"""
+Concurrency stress test for LoanDecisionSystem behind a BatchExecutor
+"""
+import sys
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = PROJECT_ROOT / "src"
+sys.path.append(str(SRC_DIR))
+
+from src.batch_executor import BatchExecutor  # noqa: E402
+from src.descision_system import LoanDecisionSystem  # noqa: E402
+from src.metrics import DecisionMetrics  # noqa: E402
+from src.pd_cache import PDCache  # noqa: E402
+
+MODEL_PATH = str(PROJECT_ROOT / "models" / "logistic_regression_model.joblib")
+# Two policies that disagree on many applicants; a half-applied update would give a third answer
+POLICY_A = {"pd_threshold": 0.10, "min_credit_score": 650, "debt_to_income_ratio": 0.35}
+POLICY_B = {"pd_threshold": 0.30, "min_credit_score": 600, "debt_to_income_ratio": 0.50}
+
+
+def test_concurrent_decisions_during_rule_updates():
+    """
+    Many threads scoring singles and chunked batches while the rules flip between two policies:
+    every result matches one whole policy, batches never mix policies, and no count is lost
+    """
+    data = pd.read_csv(PROJECT_ROOT / "data" / "loan_applications.csv", sep="\t").head(400)
+    data = data.drop(columns=["default_12m"])
+    applicants = data.to_dict("records")
+    metrics = DecisionMetrics()
+    # Small cache so entries are evicted while other threads read them
+    system = LoanDecisionSystem(MODEL_PATH, fast_path=True, pd_cache=PDCache(maxsize=50), metrics=metrics)
+
+    expected = {}
+    for name, policy in (("A", POLICY_A), ("B", POLICY_B)):
+        system.update_rule_parameters(**policy)
+        expected[name] = system.make_decisions(data)
+    assert not expected["A"]["Decision"].equals(expected["B"]["Decision"])
+    metrics.reset()
+
+    stop = threading.Event()
+    updates = [0]
+
+    def flip_policies():
+        while not stop.wait(0.001):
+            system.update_rule_parameters(**(POLICY_A if updates[0] % 2 else POLICY_B))
+            updates[0] += 1
+
+    updater = threading.Thread(target=flip_policies)
+    updater.start()
+    try:
+        with BatchExecutor(system, workers=8, chunk_size=50) as executor:
+            batches = [executor.make_decisions(data) for _ in range(10)]
+            futures = [executor.submit(applicant) for _ in range(3) for applicant in applicants]
+            singles = [future.result() for future in futures]
+    finally:
+        stop.set()
+        updater.join()
+
+    assert updates[0] > 10
+    for batch in batches:
+        assert any(batch["Decision"].equals(frame["Decision"]) and batch["Reasons"].equals(frame["Reasons"])
+                   for frame in expected.values())
+    for i, result in enumerate(singles):
+        row = i % len(applicants)
+        assert any(result["Decision"] == frame["Decision"].iloc[row]
+                   and result["Reasons"] == frame["Reasons"].iloc[row] for frame in expected.values())
+
+    snapshot = metrics.snapshot()
+    assert snapshot["rows"] == 10 * len(data) + len(singles)
+    assert snapshot["requests"]["single"] == len(singles)
+    assert sum(snapshot["decisions"].values()) == snapshot["rows"]
+    stats = system.pd_cache.stats()
+    assert stats["hits"] + stats["misses"] == len(singles)
+    assert stats["size"] <= 50
@@ -0,0 +1,72 @@
+"""
+Unit tests for the bulk scoring CLI
+"""
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = PROJECT_ROOT / "src"
+sys.path.append(str(SRC_DIR))
+
+from src.bulk_score import score_file, split_ranges  # noqa: E402
+
+DATA_PATH = PROJECT_ROOT / "data" / "loan_applications.csv"
+MODEL_PATH = str(PROJECT_ROOT / "models" / "logistic_regression_model.joblib")
+
+
+def test_split_ranges_cover_file_on_line_boundaries():
+    header, ranges = split_ranges(DATA_PATH, chunk_bytes=5_000)
+    content = DATA_PATH.read_bytes()
+    assert content.startswith(header)
+    assert ranges[0][0] == len(header)
+    assert ranges[-1][1] == len(content)
+    for (_, end), (start, _) in zip(ranges, ranges[1:]):
+        assert end == start
+        assert content[end - 1:end] == b"\n"
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_score_file_matches_make_decisions(tmp_path, workers):
+    """
+    Output rows follow the input order and match scoring the whole file at once
+    """
+    from descision_system import LoanDecisionSystem
+
+    output = tmp_path / "decisions.tsv"
+    rows, seconds = score_file(str(DATA_PATH), str(output), MODEL_PATH, workers=workers, chunk_bytes=5_000)
+
+    expected = LoanDecisionSystem(MODEL_PATH).make_decisions(pd.read_csv(DATA_PATH, sep="\t"))
+    result = pd.read_csv(output, sep="\t")
+    assert rows == len(result) == len(expected) == 1000
+    assert list(result["Decision"]) == list(expected["Decision"])
+    assert list(result["Reasons"]) == ["; ".join(r) for r in expected["Reasons"]]
+    assert (result["Predicted_PD"] - expected["Predicted_PD"]).abs().max() < 1e-9
+
+
+def test_score_file_missing_columns(tmp_path):
+    source = tmp_path / "partial.tsv"
+    source.write_text("age\tannual_income\n30\t50000\n")
+    with pytest.raises(ValueError):
+        score_file(str(source), str(tmp_path / "out.tsv"), MODEL_PATH, workers=1)
+
+
+def test_failed_run_leaves_no_partial_output(tmp_path):
+    """
+    A chunk that fails to score stops the run; the previous output stays and no temp file is left
+    """
+    lines = DATA_PATH.read_text().splitlines(keepends=True)
+    columns = lines[0].rstrip("\n").split("\t")
+    bad_row = lines[-1].rstrip("\n").split("\t")
+    bad_row[columns.index("credit_score")] = "unknown"
+    source = tmp_path / "bad.tsv"
+    source.write_text("".join(lines[:-1]) + "\t".join(bad_row) + "\n")
+    output = tmp_path / "decisions.tsv"
+    output.write_text("previous run\n")
+
+    with pytest.raises(ValueError):
+        score_file(str(source), str(output), MODEL_PATH, workers=2, chunk_bytes=5_000)
+    assert output.read_text() == "previous run\n"
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["bad.tsv", "decisions.tsv"]
@@ -0,0 +1,82 @@
+"""
+Unit tests for CompiledScorer
+"""
+import sys
+import warnings
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = PROJECT_ROOT / "src"
+sys.path.append(str(SRC_DIR))
+
+from src.compiled_scorer import CompiledScorer  # noqa: E402
+
+
+@pytest.fixture
+def pipeline_and_data():
+    pipeline = joblib.load(PROJECT_ROOT / "models" / "logistic_regression_model.joblib")
+    data = pd.read_csv(PROJECT_ROOT / "data" / "loan_applications.csv", sep="\t")
+    return pipeline, data.drop(columns=["default_12m"])
+
+
+def test_compiled_scorer_matches_pipeline(pipeline_and_data):
+    """
+    Folded coefficients give the same PD as pipeline.predict_proba, one by one and in batch
+    """
+    pipeline, data = pipeline_and_data
+    scorer = CompiledScorer.from_pipeline(pipeline)
+    expected = pipeline.predict_proba(data)[:, 1]
+
+    np.testing.assert_allclose(scorer.predict_pd_batch(data), expected, rtol=0, atol=1e-9)
+    single = [scorer.predict_pd(row) for row in data.head(100).to_dict("records")]
+    np.testing.assert_allclose(single, expected[:100], rtol=0, atol=1e-9)
+
+
+def test_unknown_category_is_ignored(pipeline_and_data):
+    """
+    Unknown categories contribute nothing, like OneHotEncoder(handle_unknown="ignore")
+    """
+    pipeline, data = pipeline_and_data
+    scorer = CompiledScorer.from_pipeline(pipeline)
+    applicant = data.iloc[0].to_dict()
+    applicant["purpose"] = "wedding"
+
+    expected = pipeline.predict_proba(pd.DataFrame([applicant]))[0, 1]
+    assert scorer.predict_pd(applicant) == pytest.approx(expected, abs=1e-9)
+    with warnings.catch_warnings():
+        # Unseen values must not go through a (deprecated) pd.Categorical conversion
+        warnings.simplefilter("error")
+        batch = scorer.predict_pd_batch(pd.DataFrame([applicant]))
+    assert batch[0] == pytest.approx(expected, abs=1e-9)
+
+
+def test_save_and_load_roundtrip(pipeline_and_data, tmp_path):
+    pipeline, data = pipeline_and_data
+    scorer = CompiledScorer.from_pipeline(pipeline)
+    scorer.save(tmp_path / "scorer.json")
+    loaded = CompiledScorer.load(tmp_path / "scorer.json")
+
+    applicant = data.iloc[3].to_dict()
+    assert loaded.predict_pd(applicant) == scorer.predict_pd(applicant)
+    assert loaded.categorical_weights["loan_term_months"].keys() == {12, 24, 36, 48, 60}
+
+
+def test_compiles_float32_preprocessing():
+    """
+    The cast + scaler numeric pipeline from DataPreprocessor(dtype=np.float32) folds like a plain scaler
+    """
+    from src.data_preprocessing import DataPreprocessor
+    from src.ml_model_training import MLModelTrainer
+
+    data = pd.read_csv(PROJECT_ROOT / "data" / "loan_applications.csv", sep="\t")
+    X, y = data.drop(columns=["default_12m"]), data["default_12m"]
+    trainer = MLModelTrainer()
+    trainer.train_model(X, y, DataPreprocessor(dtype=np.float32, layout="csr").preprocessor)
+    scorer = CompiledScorer.from_pipeline(trainer.pipeline)
+    # Float32 features round at about 1e-7, the folded float64 weights do not
+    np.testing.assert_allclose(scorer.predict_pd_batch(X), trainer.pipeline.predict_proba(X)[:, 1], atol=1e-6)
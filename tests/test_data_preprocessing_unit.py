@@ -52,3 +52,99 @@ def test_transform_data_without_fit():
     except Exception:
         error = True
     assert error
+
+# Test streaming load in chunks
+def test_load_and_split_data_chunked():
+    dp = DataPreprocessor()
+    X_train, X_test, y_train, y_test = dp.load_and_split_data('data/loan_applications.csv', chunksize=100)
+    # Every row ends up in exactly one side
+    assert len(X_train) + len(X_test) == 1000
+    assert len(set(X_train.index) & set(X_test.index)) == 0
+    # Roughly a quarter held back, with the default rate kept on both sides
+    assert abs(len(X_test) - 250) <= 2
+    assert abs(y_train.mean() - y_test.mean()) < 0.01
+    # Compact dtypes
+    assert X_train['age'].dtype == 'int8'
+    assert X_train['debt_to_income'].dtype == 'float32'
+    assert X_train['purpose'].dtype == 'category'
+    # Same split every run
+    X_train2, _, _, _ = dp.load_and_split_data('data/loan_applications.csv', chunksize=100)
+    assert list(X_train2.index) == list(X_train.index)
+
+# Test chunks missing columns are rejected
+def test_iter_chunks_missing_columns(tmp_path):
+    path = tmp_path / 'partial.csv'
+    path.write_text('age\tannual_income\n30\t50000\n')
+    dp = DataPreprocessor()
+    error = False
+    try:
+        list(dp.iter_chunks(path, chunksize=10))
+    except ValueError:
+        error = True
+    assert error
+    # load_and_split_data keeps returning Nones for a bad file
+    assert dp.load_and_split_data(path, chunksize=10) == (None, None, None, None)
+
+# Test a bad value in a streamed file is raised as itself, not reported as missing columns
+def test_chunked_bad_value_propagates(tmp_path):
+    lines = open('data/loan_applications.csv').read().splitlines(keepends=True)
+    path = tmp_path / 'bad.csv'
+    path.write_text(''.join(lines[:20]) + 'abc' + lines[20][lines[20].index('\t'):])
+    message = None
+    try:
+        DataPreprocessor().load_and_split_data(path, chunksize=10)
+    except ValueError as e:
+        message = str(e)
+    assert message is not None and 'missing' not in message
+
+# Test columnar cache is written, reused and invalidated when the file changes
+def test_load_dataframe_cache(tmp_path):
+    import shutil
+    import pandas as pd
+    source = tmp_path / 'loans.csv'
+    shutil.copy('data/loan_applications.csv', source)
+    dp = DataPreprocessor()
+
+    first = dp.load_dataframe(source)
+    entries = [p for p in (tmp_path / '.cache').iterdir() if p.is_dir()]
+    assert len(entries) == 1
+    cached = dp.load_dataframe(source)
+    assert cached.equals(first)
+    # Same dtypes as a plain read, so the cache doesn't change what a model is trained on
+    assert cached.dtypes.equals(pd.read_csv(source, sep='\t').dtypes)
+    compact = dp.load_dataframe(source, compact=True)
+    assert compact['purpose'].dtype == 'category' and compact['age'].dtype == 'int8'
+
+    # Change the file, the old cache entries must not be used and are deleted
+    lines = source.read_text().splitlines(keepends=True)
+    source.write_text(''.join(lines[:501]))
+    changed = dp.load_dataframe(source)
+    assert len(changed) == 500
+    assert len([p for p in (tmp_path / '.cache').iterdir() if p.is_dir()]) == 1
+    X_train, X_test, y_train, y_test = dp.load_and_split_data(source, use_cache=True)
+    assert len(X_train) + len(X_test) == 500
+
+# float32 / explicit layout / declared vocabulary give the same features as the default mode
+def test_float32_and_layout_options():
+    import numpy as np
+    import pytest
+    from scipy import sparse
+    from src.data_preprocessing import DECLARED_CATEGORIES
+    X_train, X_test, _, _ = DataPreprocessor().load_and_split_data('data/loan_applications.csv')
+    reference = DataPreprocessor().preprocessor.fit(X_train).transform(X_test)
+
+    dense = DataPreprocessor(dtype=np.float32, layout="dense", categories=DECLARED_CATEGORIES)
+    X_dense = dense.preprocessor.fit(X_train).transform(X_test)
+    assert isinstance(X_dense, np.ndarray) and X_dense.dtype == np.float32
+    np.testing.assert_allclose(X_dense, reference, atol=1e-5)
+
+    X_csr = DataPreprocessor(dtype=np.float32, layout="csr").preprocessor.fit(X_train).transform(X_test)
+    assert sparse.isspmatrix_csr(X_csr) and X_csr.dtype == np.float32
+    np.testing.assert_allclose(X_csr.toarray(), reference, atol=1e-5)
+
+    # A category outside the declared vocabulary encodes as zeros instead of growing the output
+    fixed = DataPreprocessor(categories=DECLARED_CATEGORIES).preprocessor.fit(X_train.head(20))
+    unseen = X_test.head(1).assign(purpose="boat")
+    assert fixed.transform(unseen).shape[1] == reference.shape[1]
+    with pytest.raises(ValueError):
+        DataPreprocessor(layout="coo")
@@ -0,0 +1,101 @@
+"""
+Unit tests for DecisionResults and the append-only DecisionStore
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = PROJECT_ROOT / "src"
+sys.path.append(str(SRC_DIR))
+
+from src.decision_store import DecisionResults, DecisionStore, ParquetDecisionWriter  # noqa: E402
+from src.descision_system import LoanDecisionSystem  # noqa: E402
+
+MODEL_PATH = str(PROJECT_ROOT / "models" / "logistic_regression_model.joblib")
+
+
+def _decisions():
+    data = pd.read_csv(PROJECT_ROOT / "data" / "loan_applications.csv", sep="\t").head(300)
+    system = LoanDecisionSystem(MODEL_PATH)
+    return system, data, system.make_decision_results(data)
+
+
+def test_results_convert_to_existing_formats_and_filter():
+    """
+    Compact results give back the make_decisions/apply_rules values, and filter by decision and reason
+    """
+    system, data, results = _decisions()
+    expected = system.make_decisions(data)
+
+    assert results.nbytes == 15 * len(data)
+    for result, (_, row) in zip(results.to_dicts(), expected.iterrows()):
+        assert result["Decision"] == row["Decision"]
+        assert result["Reasons"] == row["Reasons"]
+        assert result["Predicted_PD"] == pytest.approx(row["Predicted_PD"], rel=1e-6)
+    frame = results.to_frame()
+    assert list(frame["Reasons"]) == list(expected["Reasons"])
+    assert (frame["Decision"].to_numpy() == expected["Decision"].to_numpy()).all()
+
+    # String ids can't be int64 row ids, positions are used instead
+    by_name = system.make_decision_results(data.set_axis([f"A{i}" for i in range(len(data))]))
+    np.testing.assert_array_equal(by_name.row_ids, np.arange(len(data)))
+
+    low_credit = results.filter(decision="Rejected", reason="Low Credit Score")
+    expected_rows = expected.index[expected["Reasons"].apply(lambda reasons: "Low Credit Score" in reasons)]
+    np.testing.assert_array_equal(low_credit.row_ids, expected_rows)
+    assert results.counts()["Low Credit Score"] == len(expected_rows)
+    assert len(results.filter(decision="Approved")) + len(results.filter(decision="Rejected")) == len(data)
+
+
+def test_store_appends_and_memory_maps(tmp_path):
+    """
+    Appends accumulate across reopenings, row ids continue, and a torn last record is dropped
+    """
+    _, _, results = _decisions()
+    path = tmp_path / "decisions.bin"
+    store = DecisionStore(path)
+    store.append(results.take(slice(0, 100)))
+    store.append_masks(results.reason_masks[100:], results.predicted_pds[100:])
+    with open(path, "ab") as f:
+        f.write(b"\x01\x02\x03")  # half-written record
+
+    reopened = DecisionStore(path)
+    assert len(reopened) == len(results)
+    stored = reopened.results()
+    assert isinstance(stored.reason_masks, np.memmap)
+    np.testing.assert_array_equal(stored.reason_masks, results.reason_masks)
+    np.testing.assert_array_equal(stored.row_ids, np.arange(len(results)))
+    assert reopened.append(results.take(slice(0, 1))) == len(results) + 1
+
+    with pytest.raises(ValueError):
+        DecisionStore(path, reasons=("Other",))
+
+    # A store written with another record layout is refused rather than mapped wrongly
+    other = tmp_path / "other.bin"
+    DecisionStore(other)
+    content = other.read_bytes().replace(b'"<f4"', b'"<f8"')
+    other.write_bytes(content)
+    with pytest.raises(ValueError):
+        DecisionStore(other)
+
+
+def test_parquet_round_trip(tmp_path):
+    """
+    Appends to Parquet land as row groups and read back as the same arrays
+    """
+    pytest.importorskip("pyarrow")
+    _, _, results = _decisions()
+    path = tmp_path / "decisions.parquet"
+    with ParquetDecisionWriter(path) as writer:
+        writer.append(results.take(slice(0, 150)))
+        writer.append(results.take(slice(150, None)))
+
+    loaded = DecisionResults.read_parquet(path)
+    assert loaded.reasons == results.reasons
+    np.testing.assert_array_equal(loaded.reason_masks, results.reason_masks)
+    np.testing.assert_array_equal(loaded.predicted_pds, results.predicted_pds)
+    np.testing.assert_array_equal(loaded.row_ids, results.row_ids)
@@ -40,3 +40,68 @@ def test_integration_workflow(monkeypatch):
     result2 = system.make_decision(applicant)
     # Fail - expect 'Rejected' but dummy always returns 'Approved'
     assert result2 == 'Rejected'
+
+# Batch scoring with the real model matches scoring rows one by one
+def test_make_decisions_with_saved_model():
+    import pandas as pd
+    data = pd.read_csv('data/loan_applications.csv', sep='\t').head(50)
+    system = LoanDecisionSystem()
+    results = system.make_decisions(data)
+    assert list(results.index) == list(data.index)
+    for i, applicant in enumerate(data.drop(columns=['default_12m']).to_dict('records')):
+        single = system.make_decision(applicant)
+        assert results["Decision"].iloc[i] == single["Decision"]
+        assert results["Reasons"].iloc[i] == single["Reasons"]
+        assert results["Predicted_PD"].iloc[i] == pytest.approx(single["Predicted_PD"], abs=1e-12)
+
+# A row missing some features is rejected in a batch too, not scored as an unknown category
+@pytest.mark.parametrize("fast_path", [False, True])
+def test_rows_missing_features_are_rejected(fast_path):
+    import pandas as pd
+    data = pd.read_csv('data/loan_applications.csv', sep='\t').drop(columns=['default_12m'])
+    full = data.iloc[0].to_dict()
+    without_purpose = {k: v for k, v in full.items() if k != 'purpose'}
+    system = LoanDecisionSystem(fast_path=fast_path)
+    with pytest.raises(KeyError):
+        system.make_decision(without_purpose)
+    with pytest.raises(ValueError):
+        system.make_decision(dict(full, purpose=None))
+    with pytest.raises(KeyError):
+        system.make_decisions([without_purpose])
+    with pytest.raises(ValueError):
+        system.make_decisions([full, without_purpose])
+    with pytest.raises(ValueError):
+        system.make_decisions(data.head(5).assign(purpose=[None, 'car', 'car', 'car', 'car']))
+
+# Compiled fast path gives the same decisions as the sklearn pipeline
+def test_fast_path_matches_pipeline():
+    import pandas as pd
+    data = pd.read_csv('data/loan_applications.csv', sep='\t').head(200)
+    reference = LoanDecisionSystem().make_decisions(data)
+    fast = LoanDecisionSystem(fast_path=True)
+    results = fast.make_decisions(data)
+    assert (results["Decision"] == reference["Decision"]).all()
+    assert (results["Predicted_PD"] - reference["Predicted_PD"]).abs().max() < 1e-9
+    single = fast.make_decision(data.drop(columns=['default_12m']).iloc[0].to_dict())
+    assert single["Predicted_PD"] == pytest.approx(reference["Predicted_PD"].iloc[0], abs=1e-9)
+
+# The slim JSON model scores like the pipeline and loads without importing sklearn
+def test_slim_model_loads_without_sklearn():
+    import io
+    import subprocess
+    import pandas as pd
+    code = (
+        "import sys; sys.path.insert(0, './src')\n"
+        "import pandas as pd\n"
+        "from descision_system import LoanDecisionSystem\n"
+        "system = LoanDecisionSystem('models/logistic_regression_model.json')\n"
+        "data = pd.read_csv('data/loan_applications.csv', sep='\\t').head(200)\n"
+        "print(system.make_decisions(data)['Predicted_PD'].to_json())\n"
+        "sys.exit('sklearn' in sys.modules)\n"
+    )
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    slim = pd.read_json(io.StringIO(result.stdout), typ='series')
+    data = pd.read_csv('data/loan_applications.csv', sep='\t').head(200)
+    reference = LoanDecisionSystem().make_decisions(data)["Predicted_PD"]
+    assert abs(slim.to_numpy() - reference.to_numpy()).max() < 1e-9
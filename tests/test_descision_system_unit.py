@@ -54,3 +54,52 @@ def test_update_rule_parameters(monkeypatch):
     system = LoanDecisionSystem()
     # Should not raise error
     system.update_rule_parameters(pd_threshold=0.2)
+
+def test_make_decisions_matches_make_decision(monkeypatch):
+    # Real rule engine, so batch output can be compared with the single-row path
+    monkeypatch.setattr('joblib.load', lambda path: DummyModel())
+    system = LoanDecisionSystem()
+    applicant = {
+        'age': 30, 'annual_income': 50000, 'employment_length': 5, 'credit_score': 700,
+        'debt_to_income': 0.2, 'num_open_accounts': 5, 'delinquencies_2y': 0,
+        'inquiries_6m': 1, 'loan_amount': 10000, 'interest_rate': 0.05,
+        'purpose': 'car', 'home_ownership': 'own', 'channel': 'online',
+        'region': 'north', 'loan_term_months': 36
+    }
+    results = system.make_decisions([applicant, dict(applicant, credit_score=600)])
+    assert len(results) == 2
+    for i, row in enumerate([applicant, dict(applicant, credit_score=600)]):
+        single = system.make_decision(row)
+        assert results["Decision"].iloc[i] == single["Decision"]
+        assert results["Reasons"].iloc[i] == single["Reasons"]
+        assert results["Predicted_PD"].iloc[i] == single["Predicted_PD"]
+
+def test_pd_cache_skips_model_but_not_rules(monkeypatch):
+    from pd_cache import PDCache
+
+    class CountingModel(DummyModel):
+        calls = 0
+        def predict_proba(self, X):
+            CountingModel.calls += 1
+            return super().predict_proba(X)
+
+    monkeypatch.setattr('joblib.load', lambda path: CountingModel())
+    system = LoanDecisionSystem(pd_cache=PDCache())
+    applicant = {
+        'age': 30, 'annual_income': 50000, 'employment_length': 5, 'credit_score': 700,
+        'debt_to_income': 0.2, 'num_open_accounts': 5, 'delinquencies_2y': 0,
+        'inquiries_6m': 1, 'loan_amount': 10000, 'interest_rate': 0.05,
+        'purpose': 'car', 'home_ownership': 'own', 'channel': 'online',
+        'region': 'north', 'loan_term_months': 36
+    }
+    first = system.make_decision(applicant)
+    # Raise the PD threshold, the cached PD of 0.8 now passes
+    system.update_rule_parameters(pd_threshold=0.9)
+    second = system.make_decision(applicant)
+    assert CountingModel.calls == 1
+    assert first["Decision"] == "Rejected"
+    assert second["Decision"] == "Approved"
+    assert system.pd_cache.stats()["hits"] == 1
+    # Loading a model empties the cache
+    system.load_model("models/logistic_regression_model.joblib")
+    assert system.pd_cache.stats()["size"] == 0
@@ -0,0 +1,43 @@
+"""
+Unit tests for FeatureSchema
+"""
+import sys
+from pathlib import Path
+
+import joblib
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = PROJECT_ROOT / "src"
+sys.path.append(str(SRC_DIR))
+
+from src.feature_schema import FeatureSchema  # noqa: E402
+
+
+def test_schema_from_saved_pipeline():
+    """
+    Column order and which columns are one-hot encoded come from the fitted pipeline
+    """
+    pipeline = joblib.load(PROJECT_ROOT / "models" / "logistic_regression_model.joblib")
+    schema = FeatureSchema.from_pipeline(pipeline)
+
+    assert schema.columns[:2] == ("age", "annual_income")
+    assert len(schema.columns) == 15
+    assert schema.categorical_features == ("purpose", "home_ownership", "channel", "region", "loan_term_months")
+
+    df = schema.frame([{"region": "north", "age": 30}])
+    assert list(df.columns) == list(schema.columns)
+
+
+def test_schema_is_immutable():
+    schema = FeatureSchema(["age"], ["region"])
+    assert schema.columns == ("age", "region")
+    with pytest.raises(Exception):
+        schema.numeric_features = ("income",)
+    with pytest.raises(Exception):
+        schema.columns = ("income",)
+
+
+def test_from_pipeline_rejects_non_pipeline():
+    with pytest.raises(ValueError):
+        FeatureSchema.from_pipeline(object())
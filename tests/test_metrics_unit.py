@@ -0,0 +1,114 @@
+"""
+Unit tests for DecisionMetrics and the LoanDecisionSystem instrumentation
+"""
+import json
+import logging
+import sys
+from collections import Counter
+from pathlib import Path
+
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = PROJECT_ROOT / "src"
+sys.path.append(str(SRC_DIR))
+
+from src.descision_system import LoanDecisionSystem  # noqa: E402
+from src.metrics import DecisionMetrics, Histogram  # noqa: E402
+
+MODEL_PATH = str(PROJECT_ROOT / "models" / "logistic_regression_model.joblib")
+
+
+def test_histogram_and_prometheus_export():
+    """
+    Observations land in the right buckets and export as cumulative Prometheus buckets
+    """
+    histogram = Histogram(buckets=(0.001, 0.01))
+    for value in (0.0005, 0.001, 0.005, 0.5):
+        histogram.observe(value)
+    assert histogram.counts == [2, 1, 1]
+    assert histogram.quantile(0.5) == 0.001
+    assert histogram.quantile(1.0) == float("inf")
+
+    metrics = DecisionMetrics(buckets=(0.001, 0.01))
+    metrics.stages["predict"] = histogram
+    metrics.record_decision({"Decision": "Rejected", "Reasons": ["Low Credit Score"]})
+    text = metrics.to_prometheus()
+    assert 'loan_decision_stage_seconds_bucket{stage="predict",le="0.01"} 3' in text
+    assert 'loan_decision_stage_seconds_bucket{stage="predict",le="+Inf"} 4' in text
+    assert 'loan_decision_stage_seconds_count{stage="predict"} 4' in text
+    assert 'loan_decision_decisions_total{decision="Rejected"} 1' in text
+    assert 'loan_decision_reasons_total{reason="Low Credit Score"} 1' in text
+
+
+def test_system_records_stages_and_distributions(caplog):
+    """
+    Single and batch decisions are timed per stage and counted the same way the results read
+    """
+    data = pd.read_csv(PROJECT_ROOT / "data" / "loan_applications.csv", sep="\t").head(100)
+    metrics = DecisionMetrics()
+    system = LoanDecisionSystem(MODEL_PATH, metrics=metrics)
+
+    results = system.make_decisions(data)
+    single = system.make_decision(data.drop(columns=["default_12m"]).iloc[0].to_dict())
+
+    snapshot = metrics.snapshot()
+    assert set(snapshot["stages"]) == {"frame", "predict", "rules", "total",
+                                       "batch_frame", "batch_predict", "batch_rules", "batch_total"}
+    assert snapshot["requests"] == {"batch": 1, "single": 1}
+    assert snapshot["rows"] == 101
+    expected = Counter(results["Decision"])
+    expected[single["Decision"]] += 1
+    assert snapshot["decisions"] == dict(expected)
+    expected_reasons = Counter(reason for reasons in results["Reasons"] for reason in reasons)
+    expected_reasons.update(single["Reasons"])
+    assert snapshot["reasons"] == dict(expected_reasons)
+
+    with caplog.at_level(logging.INFO, logger="loan_decision.metrics"):
+        metrics.log()
+    assert json.loads(caplog.records[-1].getMessage())["rows"] == 101
+
+
+def test_compact_results_are_counted():
+    """
+    make_decision_results is timed and counted like make_decisions
+    """
+    data = pd.read_csv(PROJECT_ROOT / "data" / "loan_applications.csv", sep="\t").head(100)
+    metrics = DecisionMetrics()
+    system = LoanDecisionSystem(MODEL_PATH, metrics=metrics)
+
+    results = system.make_decision_results(data)
+
+    snapshot = metrics.snapshot()
+    assert snapshot["requests"] == {"batch": 1} and snapshot["rows"] == 100
+    counts = results.counts()
+    for decision in ("Approved", "Rejected"):
+        assert snapshot["decisions"].get(decision, 0) == counts[decision]
+    assert snapshot["reasons"].get("Low Credit Score", 0) == counts["Low Credit Score"]
+    assert "batch_total" in snapshot["stages"]
+
+
+def test_disabled_by_default_and_trace_is_opt_in(capsys):
+    """
+    Without metrics nothing is recorded, and the PD is only printed with trace=True
+    """
+    applicant = pd.read_csv(PROJECT_ROOT / "data" / "loan_applications.csv", sep="\t").iloc[0].to_dict()
+    system = LoanDecisionSystem(MODEL_PATH)
+    system.make_decision(applicant)
+    assert system.metrics is None
+    assert capsys.readouterr().out == ""
+
+    LoanDecisionSystem(MODEL_PATH, trace=True).make_decision(applicant)
+    assert "Predicted PD:" in capsys.readouterr().out
+
+
+def test_prometheus_label_values_are_escaped():
+    """
+    Backslashes, double quotes and newlines in reasons or decisions don't break the exposition
+    """
+    metrics = DecisionMetrics()
+    metrics.record_decision({"Decision": 'Re"ferred', "Reasons": ['DTI > 0.4 "hard"\\cap\nreview']})
+    text = metrics.to_prometheus()
+    assert 'loan_decision_decisions_total{decision="Re\\"ferred"} 1' in text
+    assert 'loan_decision_reasons_total{reason="DTI > 0.4 \\"hard\\"\\\\cap\\nreview"} 1' in text
+    assert all(line.startswith(("#", "loan_decision_")) for line in text.splitlines())
@@ -46,3 +46,82 @@ def test_full_training_pipeline(tmp_path):
 
     trainer.save_model()
     assert model_file.exists(), "Model file was not created"
+
+
+def test_out_of_core_training_matches_batch(tmp_path):
+    """
+    Streaming SGD training scores held-out rows about as well as the batch model, and its
+    pipeline works with the compiled scorer
+    """
+    import pandas as pd
+    from src.compiled_scorer import CompiledScorer
+    from src.data_preprocessing import DECLARED_CATEGORIES
+    sys.path.append(str(PROJECT_ROOT / "benchmarks"))
+    from synthetic_data import generate_applicants
+
+    # Synthetic applicants whose default depends on credit score and DTI
+    data = generate_applicants(20_000, with_target=False)
+    z = -1 - 0.01 * (data["credit_score"] - 700) + 3 * (data["debt_to_income"] - 0.3)
+    data["default_12m"] = (np.random.default_rng(1).random(len(data)) < 1 / (1 + np.exp(-z))).astype(int)
+    path = tmp_path / "applications.tsv"
+    data.to_csv(path, sep="\t", index=False)
+
+    dp = DataPreprocessor(categories=DECLARED_CATEGORIES)
+    trainer = MLModelTrainer(model_filepath=str(tmp_path / "model.joblib"))
+    metrics = trainer.train_out_of_core(str(path), dp, epochs=3, chunksize=4_000)
+
+    # The streamed scaler saw exactly the training rows
+    X_train = pd.concat(X for X, _, _, _ in dp.iter_split_chunks(str(path), 4_000))
+    scaler = trainer.pipeline.named_steps["preprocessor"].named_transformers_["num"]
+    np.testing.assert_allclose(scaler.mean_, X_train[dp.numeric_features].astype(float).mean().to_numpy(),
+                               rtol=1e-9)
+
+    batch = MLModelTrainer()
+    X_train, X_test, y_train, y_test = DataPreprocessor().load_and_split_data(str(path))
+    batch.train_model(X_train, y_train, DataPreprocessor().preprocessor)
+    from sklearn.metrics import roc_auc_score
+    batch_auc = roc_auc_score(y_test, batch.pipeline.predict_proba(X_test)[:, 1])
+    assert metrics["roc_auc"] > batch_auc - 0.02
+
+    scorer = CompiledScorer.from_pipeline(trainer.pipeline)
+    np.testing.assert_allclose(scorer.predict_pd_batch(X_test), trainer.pipeline.predict_proba(X_test)[:, 1],
+                               atol=1e-9)
+
+    with pytest.raises(ValueError):
+        trainer.train_out_of_core(str(path), DataPreprocessor())
+
+
+def test_warm_start_retraining():
+    """
+    Warm start keeps the previous PDs until fitted, updates the scaler with only the new rows,
+    and ends up close to a cold fit on the same rows
+    """
+    import pandas as pd
+    from src.ml_model_training import _warm_start_from
+    data = pd.read_csv(PROJECT_ROOT / "data" / "loan_applications.csv", sep="\t")
+    X, y = data.drop(columns=["default_12m"]), data["default_12m"]
+    history, new = slice(0, 800), slice(800, None)
+    trainer = MLModelTrainer()
+    trainer.train_model(X.iloc[history], y.iloc[history], DataPreprocessor().preprocessor)
+    previous = trainer.pipeline
+
+    prepared = _warm_start_from(previous, X.iloc[new])
+    np.testing.assert_allclose(prepared.predict_proba(X)[:, 1], previous.predict_proba(X)[:, 1], atol=1e-12)
+    scaler = prepared.named_steps["preprocessor"].named_transformers_["num"]
+    assert scaler.n_samples_seen_ == len(data)
+    np.testing.assert_allclose(scaler.mean_, X[DataPreprocessor().numeric_features].mean().to_numpy())
+
+    report = trainer.retrain_warm_start(X.iloc[new], y.iloc[new], previous, X.iloc[history], y.iloc[history],
+                                        compare_cold=True)
+    assert report["n_iter"] <= report["cold_n_iter"]
+    assert trainer.pipeline is not previous
+    cold = MLModelTrainer()
+    cold.train_model(X, y, DataPreprocessor().preprocessor)
+    np.testing.assert_allclose(trainer.pipeline.predict_proba(X)[:, 1], cold.pipeline.predict_proba(X)[:, 1],
+                               atol=1e-2)
+
+    # Without a recent window the fit would forget the history, unless the update is capped
+    with pytest.raises(ValueError):
+        trainer.retrain_warm_start(X.iloc[new], y.iloc[new], previous)
+    report = trainer.retrain_warm_start(X.iloc[new], y.iloc[new], previous, max_iter=3)
+    assert report["n_iter"] <= 3 and "cold_n_iter" not in report
@@ -22,8 +22,9 @@ import numpy as np
 import pandas as pd
 from sklearn.compose import ColumnTransformer
 from sklearn.preprocessing import StandardScaler, OneHotEncoder
+from sklearn.metrics import confusion_matrix
 
-from src.ml_model_training import MLModelTrainer
+from src.ml_model_training import MLModelTrainer, misclassification_cost
 
 
 @pytest.fixture
@@ -113,3 +114,49 @@ def test_save_and_load_methods(test_data_and_preproc, tmp_path):
 
     probs_after = loaded_model.predict_proba(X)[:, 1]  
     np.testing.assert_allclose(probs_before, probs_after, rtol=0, atol=1e-12)  #
+
+def test_search_hyperparameters_reports_each_candidate(test_data_and_preproc):
+    """
+    Every grid candidate gets CV metrics and a fit time, and the best settings can be refitted
+    """
+    X, y, preproc = test_data_and_preproc
+    trainer = MLModelTrainer()
+    grid = {"C": [0.1, 1.0], "penalty": ["l2"], "solver": ["lbfgs"], "class_weight": ["balanced"]}
+
+    results = trainer.search_hyperparameters(X, y, preproc, param_grid=grid, n_splits=2, n_jobs=2)
+
+    assert len(results) == 2
+    for col in ["roc_auc", "pr_auc", "brier", "fit_seconds"]:
+        assert col in results.columns
+    assert (results["fit_seconds"] > 0).all()
+    assert results["roc_auc"].is_monotonic_decreasing
+    assert trainer.best_params["C"] == results["C"].iloc[0]
+
+    trainer.train_model(X, y, preproc, **trainer.best_params)
+    assert trainer.pipeline.named_steps["classifier"].C == trainer.best_params["C"]
+
+
+def test_sweep_cutoffs_matches_confusion_matrix_per_cutoff(test_data_and_preproc):
+    """
+    The one-pass sweep gives the same confusion counts as evaluating each cutoff separately,
+    and picks the cutoff with the lowest cost
+    """
+    X, y, preproc = test_data_and_preproc
+    trainer = MLModelTrainer()
+    trainer.train_model(X, y, preproc)
+    y_proba = trainer.pipeline.predict_proba(X)[:, 1]
+    # Every predicted PD as a cutoff as well, ties with the cutoff reject
+    cutoffs = np.concatenate(([0.0, 0.12, 0.5, 1.0], y_proba))
+
+    table, best = trainer.sweep_cutoffs(X, y, cutoffs=cutoffs, cost_fn=misclassification_cost(5.0, 1.0),
+                                        exposure=X["loan_amount"])
+
+    for row in table.itertuples(index=False):
+        y_pred = (y_proba >= row.cutoff).astype(int)
+        tn, fp, fn, tp = confusion_matrix(y, y_pred, labels=[0, 1]).ravel()
+        assert (row.tn, row.fp, row.fn, row.tp) == (tn, fp, fn, tp)
+        assert row.approval_rate == pytest.approx(np.mean(y_pred == 0))
+        assert row.expected_loss == pytest.approx(np.sum((y_proba * X["loan_amount"])[y_pred == 0]))
+        assert row.cost == pytest.approx(5.0 * fn + fp)
+    assert best == table.loc[table["cost"].idxmin(), "cutoff"]
+    assert trainer.best_cutoff == best
@@ -0,0 +1,104 @@
+"""
+Unit tests for ModelWatcher hot reloading
+"""
+import shutil
+import sys
+from pathlib import Path
+
+import joblib
+import pandas as pd
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = PROJECT_ROOT / "src"
+sys.path.append(str(SRC_DIR))
+
+from src.descision_system import LoanDecisionSystem  # noqa: E402
+from src.model_registry import ModelWatcher  # noqa: E402
+
+MODEL_PATH = PROJECT_ROOT / "models" / "logistic_regression_model.joblib"
+
+
+@pytest.fixture
+def watched(tmp_path):
+    model_path = tmp_path / "model.joblib"
+    shutil.copy(MODEL_PATH, model_path)
+    golden = pd.read_csv(PROJECT_ROOT / "data" / "loan_applications.csv", sep="\t")
+    golden = golden.drop(columns=["default_12m"]).head(200)
+    system = LoanDecisionSystem(str(model_path))
+    return system, ModelWatcher(system, str(model_path), golden, max_mean_shift=0.05), model_path, golden
+
+
+def _save_with_intercept_shift(model_path, shift):
+    pipeline = joblib.load(MODEL_PATH)
+    pipeline.steps[-1][1].intercept_ = pipeline.steps[-1][1].intercept_ + shift
+    joblib.dump(pipeline, model_path)
+
+
+def test_new_artifact_is_swapped_in(watched):
+    """
+    A changed artifact that passes validation replaces the live model, unchanged files are ignored
+    """
+    system, watcher, model_path, golden = watched
+    assert not watcher.check_now()
+    old_state = system.model
+
+    _save_with_intercept_shift(model_path, 0.01)
+    assert watcher.check_now()
+    assert system.model is not old_state
+    assert system.model_version != old_state.version
+    assert (system.predict_pds(golden)[1] > old_state.ml_model.predict_proba(golden)[:, 1]).all()
+    assert watcher.swaps == 1
+
+
+def test_bad_artifacts_are_rejected(watched):
+    """
+    Half-written files and models that move the golden set too far keep the live model in place
+    """
+    system, watcher, model_path, _ = watched
+    live = system.model
+
+    model_path.write_bytes(MODEL_PATH.read_bytes()[:100])
+    assert not watcher.check_now()
+
+    _save_with_intercept_shift(model_path, 3.0)
+    assert not watcher.check_now()
+    assert "moved" in watcher.last_error
+    assert system.model is live
+    assert watcher.rejections == 2
+
+
+def test_watcher_thread_reloads(watched):
+    """
+    The background thread picks up a new artifact on its own
+    """
+    system, watcher, model_path, _ = watched
+    watcher.interval = 0.01
+    old_version = system.model_version
+    watcher.start()
+    try:
+        _save_with_intercept_shift(model_path, 0.01)
+        for _ in range(500):
+            if system.model_version != old_version:
+                break
+            watcher._stop.wait(0.01)
+    finally:
+        watcher.stop()
+    assert system.model_version != old_version
+
+
+def test_validation_stays_out_of_live_metrics(tmp_path):
+    """
+    Scoring the golden set for a reload check doesn't add to the live system's metrics
+    """
+    from src.metrics import DecisionMetrics
+    model_path = tmp_path / "model.joblib"
+    shutil.copy(MODEL_PATH, model_path)
+    golden = pd.read_csv(PROJECT_ROOT / "data" / "loan_applications.csv", sep="\t").drop(columns=["default_12m"]).head(50)
+    metrics = DecisionMetrics()
+    system = LoanDecisionSystem(str(model_path), metrics=metrics)
+    watcher = ModelWatcher(system, str(model_path), golden, max_mean_shift=0.05)
+
+    _save_with_intercept_shift(model_path, 0.01)
+    assert watcher.check_now()
+    assert metrics.snapshot()["rows"] == 0 and metrics.snapshot()["stages"] == {}
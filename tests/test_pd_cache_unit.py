@@ -0,0 +1,53 @@
+"""
+Unit tests for PDCache
+"""
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = PROJECT_ROOT / "src"
+sys.path.append(str(SRC_DIR))
+
+from src.pd_cache import PDCache  # noqa: E402
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_key_is_canonical():
+    """
+    Dict order and int/float types do not change the key, the model version does
+    """
+    a = {"age": 30, "region": "north", "debt_to_income": 0.2}
+    b = {"debt_to_income": 0.2, "region": "north", "age": 30.0}
+    assert PDCache.make_key(a, "v1") == PDCache.make_key(b, "v1")
+    assert PDCache.make_key(a, "v1") != PDCache.make_key(a, "v2")
+    assert PDCache.make_key(a, "v1") != PDCache.make_key(dict(a, age=31), "v1")
+
+
+def test_lru_eviction_and_counters():
+    cache = PDCache(maxsize=2)
+    cache.put("a", 0.1)
+    cache.put("b", 0.2)
+    assert cache.get("a") == 0.1
+    # "b" is now least recently used
+    cache.put("c", 0.3)
+    assert cache.get("b") is None
+    assert cache.get("c") == 0.3
+    assert cache.stats() == {"size": 2, "hits": 2, "misses": 1, "evictions": 1, "expirations": 0}
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = PDCache(ttl=10, clock=clock)
+    cache.put("a", 0.1)
+    clock.now = 9.9
+    assert cache.get("a") == 0.1
+    clock.now = 10.0
+    assert cache.get("a") is None
+    assert cache.expirations == 1
@@ -78,3 +78,52 @@ def test_update_rule_thresholds():
     result_after = engine.apply_rules(applicant, pd_value)
     assert result_after["Decision"] == "Approved"
     assert result_after["Reasons"] == ["All criteria met"]
+
+
+def test_apply_rules_batch_matches_apply_rules():
+    """
+    Batch evaluation gives the same decision and reasons as apply_rules for each row
+    """
+    import pandas as pd
+
+    engine = RuleEngine()
+    applicants = []
+    for credit_score, dti, age in [(700, 0.20, 30), (640, 0.40, 30), (700, 0.20, 80), (600, 0.50, 17)]:
+        applicant = _baseline_applicant()
+        applicant.update(credit_score=credit_score, debt_to_income=dti, age=age)
+        applicants.append(applicant)
+    pds = [0.05, 0.15, 0.05, 0.20]
+
+    batch = engine.apply_rules_batch(pd.DataFrame(applicants), pds)
+
+    for i, (applicant, pd_value) in enumerate(zip(applicants, pds)):
+        single = engine.apply_rules(applicant, pd_value)
+        assert batch["Decision"].iloc[i] == single["Decision"]
+        assert batch["Reasons"].iloc[i] == single["Reasons"]
+        assert batch["Predicted_PD"].iloc[i] == single["Predicted_PD"]
+
+
+def test_evaluate_batch_bitmasks_decode_to_reasons():
+    """
+    Reason bitmasks are compact and decode to the same strings as apply_rules
+    """
+    import numpy as np
+    from src.rule_engine import decode_reasons
+
+    engine = RuleEngine()
+    columns = {
+        "age": np.array([30, 80]),
+        "annual_income": np.array([30_000, 10_000]),
+        "employment_length": np.array([2, 0]),
+        "credit_score": np.array([700, 600]),
+        "debt_to_income": np.array([0.20, 0.50]),
+        "delinquencies_2y": np.array([0, 3]),
+    }
+    masks = engine.evaluate_batch(columns, [0.05, 0.50])
+
+    assert masks.dtype == np.uint16
+    assert masks[0] == 0
+    assert masks[1] == 0b1111111
+    assert decode_reasons(masks[0]) == ["All criteria met"]
+    applicant = {name: values[1] for name, values in columns.items()}
+    assert decode_reasons(masks[1]) == engine.apply_rules(applicant, 0.50)["Reasons"]
@@ -0,0 +1,98 @@
+"""
+Unit tests for RuleSet and the RuleEngine built on it
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = PROJECT_ROOT / "src"
+sys.path.append(str(SRC_DIR))
+
+from src.rule_engine import RuleEngine  # noqa: E402
+from src.rule_set import RuleSet  # noqa: E402
+
+
+def _applicants(n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    applicants = pd.DataFrame({
+        "age": rng.integers(16, 80, n),
+        "annual_income": rng.choice([10_000, 15_000, 30_000], n),
+        "employment_length": rng.integers(0, 4, n),
+        "credit_score": rng.integers(550, 800, n),
+        "debt_to_income": rng.choice([0.2, 0.35, 0.5], n),
+        "delinquencies_2y": rng.integers(0, 3, n),
+    })
+    return applicants, rng.choice([0.05, 0.10, 0.3], n)
+
+
+def test_compiled_evaluators_agree():
+    """
+    Single-dict, decision-only and batch evaluation give the same answers, reordered or not
+    """
+    applicants, pds = _applicants()
+    rule_set = RuleSet.default()
+    tuned = rule_set.ordered_by_rejections(applicants, pds)
+    assert tuned.version == rule_set.version
+    rates = rule_set.rejection_rates(applicants, pds)
+    ordered = [rates[tuned.rules[i].name] for i in tuned.decision_order]
+    assert ordered == sorted(rates.values(), reverse=True)
+
+    masks = rule_set.evaluate_batch(applicants, pds)
+    np.testing.assert_array_equal(tuned.approve_batch(applicants, pds), masks == 0)
+    for applicant, pd_value, mask in zip(applicants.to_dict("records"), pds, masks):
+        result = rule_set.apply(applicant, pd_value)
+        assert rule_set.evaluate(applicant, pd_value) == mask
+        assert result["Reasons"] == rule_set.decode(mask)
+        assert (result["Decision"] == "Approved") == (mask == 0) == tuned.is_approved(applicant, pd_value)
+
+
+def test_config_round_trip_and_custom_rules(tmp_path):
+    """
+    A rule set saved as JSON loads back the same, and new rules need no code changes
+    """
+    config = RuleSet.default().to_dict()
+    config["version"] = "2024-06-policy"
+    config["rules"].append({"name": "max_inquiries_6m", "field": "inquiries_6m", "op": ">", "threshold": 3,
+                            "reason": "Too Many Recent Inquiries", "priority": 7})
+    path = tmp_path / "rules.json"
+    RuleSet.from_dict(config).save(path)
+
+    rule_set = RuleSet.load(path)
+    assert rule_set.version == "2024-06-policy"
+    assert rule_set.threshold("max_inquiries_6m") == 3
+    engine = RuleEngine(rule_set=rule_set)
+    applicant = {"age": 30, "annual_income": 30_000, "employment_length": 2, "credit_score": 700,
+                 "debt_to_income": 0.2, "delinquencies_2y": 0, "inquiries_6m": 5}
+    assert engine.apply_rules(applicant, 0.05)["Reasons"] == ["Too Many Recent Inquiries"]
+
+    with pytest.raises(ValueError):
+        RuleSet([{"name": "x", "field": "age", "op": "=<", "threshold": 1, "reason": "x"}])
+
+
+def test_updates_swap_whole_versioned_rule_sets():
+    """
+    update_rules makes a new version, leaves the previous snapshot untouched and refuses bad thresholds
+    """
+    engine = RuleEngine(pd_threshold=0.12)
+    before = engine.rule_set
+    assert engine.pd_threshold == 0.12
+
+    engine.update_rules(min_credit_score=600, max_age=None)
+
+    assert engine.min_credit_score == 600
+    assert engine.max_age == 75
+    assert engine.version != before.version
+    assert before.threshold("min_credit_score") == 650
+    with pytest.raises(AttributeError):
+        engine.min_credit_score = 500
+    with pytest.raises(ValueError):
+        engine.update_rules(min_salary=1)
+    with pytest.raises(TypeError):
+        engine.update_rules(min_credit_score="600")
+    with pytest.raises(ValueError):
+        engine.update_rules(version="v-custom")
+    assert engine.min_credit_score == 600
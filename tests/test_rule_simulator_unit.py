@@ -0,0 +1,105 @@
+"""
+Unit tests for RuleSimulator
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = PROJECT_ROOT / "src"
+sys.path.append(str(SRC_DIR))
+
+from src.rule_engine import REASON_FLAGS, REASONS, RuleEngine  # noqa: E402
+from src.rule_set import RuleSet  # noqa: E402
+from src.rule_simulator import RuleSimulator  # noqa: E402
+
+
+def _portfolio(n=2_000, seed=0):
+    rng = np.random.default_rng(seed)
+    applicants = pd.DataFrame({
+        "age": rng.integers(16, 80, n),
+        "annual_income": rng.choice([10_000, 15_000, 20_000, 25_000, 40_000], n),
+        "employment_length": rng.integers(0, 5, n),
+        "credit_score": rng.integers(500, 800, n),
+        "debt_to_income": rng.choice([0.2, 0.3, 0.4, 0.5], n),
+        "delinquencies_2y": rng.integers(0, 4, n),
+    })
+    pds = rng.choice(np.round(np.linspace(0.0, 0.6, 13), 2), n)
+    defaults = (rng.random(n) < pds).astype(int)
+    return applicants, pds, defaults
+
+
+def test_simulation_matches_rule_engine_for_every_combination():
+    """
+    Approvals, default rates and reason shares equal a plain RuleEngine run per combination,
+    including candidate values that fall exactly on applicant values
+    """
+    applicants, pds, defaults = _portfolio()
+    engine = RuleEngine()
+    simulator = RuleSimulator(applicants, pds, engine.rule_set, defaults)
+    grid = {
+        "pd_threshold": [0.1, 0.25, 0.3, 0.5],
+        "min_income": [15_000, 20_000],
+        "min_age": [18, 21],
+        "max_age": [65, 70],
+        "debt_to_income_ratio": [0.3, 0.4],
+        "max_delinquencies_2y": [0, 1],
+    }
+    table = simulator.simulate(grid)
+    assert len(table) == 4 * 2 * 2 * 2 * 2 * 2
+    assert list(table.columns[:len(grid)]) == list(grid)
+
+    for row in table.to_dict("records"):
+        engine.update_rules(**{name: row[name] for name in RuleSimulator.params_of(engine)})
+        masks = engine.evaluate_batch(applicants, pds)
+        approved = masks == 0
+        assert row["approved"] == approved.sum()
+        assert row["expected_default_rate"] == pytest.approx(pds[approved].mean())
+        assert row["observed_default_rate"] == pytest.approx(defaults[approved].mean())
+        for reason, flag in zip(REASONS, REASON_FLAGS):
+            assert row[reason] == pytest.approx(np.mean(masks & flag != 0))
+
+
+def test_no_approvals_and_unknown_parameters():
+    """
+    A grid nobody passes gives NaN default rates, and unknown parameters are refused
+    """
+    applicants, pds, _ = _portfolio(n=100)
+    simulator = RuleSimulator(applicants, pds, RuleEngine().rule_set)
+    table = simulator.simulate({"min_credit_score": [900]})
+    assert table["approved"].iloc[0] == 0
+    assert np.isnan(table["expected_default_rate"].iloc[0])
+    assert "observed_default_rate" not in table
+
+    with pytest.raises(ValueError):
+        simulator.simulate({"max_income": [1]})
+
+
+def test_custom_rule_set_is_simulated_from_its_own_rules():
+    """
+    Added, renamed and <= / >= rules of a custom rule set sweep the same as re-running that rule set
+    """
+    applicants, pds, _ = _portfolio()
+    rule_set = RuleSet([
+        {"name": "pd_cap", "field": "predicted_pd", "op": ">=", "threshold": 0.3, "reason": "Risky", "priority": 0},
+        {"name": "income_floor", "field": "annual_income", "op": "<=", "threshold": 15_000,
+         "reason": "Low Income", "priority": 1},
+        {"name": "no_juniors", "field": "employment_length", "op": "==", "threshold": 0,
+         "reason": "New Job", "priority": 2},
+    ])
+    simulator = RuleSimulator(applicants, pds, rule_set)
+    table = simulator.simulate({"pd_cap": [0.2, 0.3, 0.5], "income_floor": [10_000, 20_000]})
+    assert len(table) == 6 and (table["no_juniors"] == 0).all()
+
+    for row in table.to_dict("records"):
+        variant = rule_set.with_thresholds(pd_cap=row["pd_cap"], income_floor=row["income_floor"])
+        masks = variant.evaluate_batch(applicants, pds)
+        assert row["approved"] == np.count_nonzero(masks == 0)
+        for bit, reason in enumerate(variant.reasons):
+            assert row[reason] == pytest.approx(np.mean(masks & (1 << bit) != 0))
+
+    with pytest.raises(ValueError):
+        simulator.simulate({"no_juniors": [0, 1]})
@@ -0,0 +1,197 @@
+"""
+Unit tests for the asyncio scoring service and its micro-batcher
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = PROJECT_ROOT / "src"
+sys.path.append(str(SRC_DIR))
+
+from src.scoring_service import ScoringService, ScoringClient  # noqa: E402
+
+
+class DummySystem:
+    # Approves everyone, records how many applicants each batch had
+    def __init__(self):
+        self.batch_sizes = []
+
+    def make_decisions(self, applicants):
+        df = pd.DataFrame(list(applicants))
+        # Missing fields raise like the real system
+        if df["credit_score"].isna().any():
+            raise ValueError("Input contains NaN")
+        self.batch_sizes.append(len(df))
+        return pd.DataFrame({
+            "Decision": ["Approved"] * len(df),
+            "Reasons": [["All criteria met"]] * len(df),
+            "Predicted_PD": df["credit_score"] / 1000.0,
+        })
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def test_concurrent_requests_are_batched():
+    """
+    Requests arriving together share one make_decisions call and each gets its own result
+    """
+    system = DummySystem()
+
+    async def scenario():
+        service = ScoringService(system, port=0, max_wait_ms=50)
+        await service.start()
+        try:
+            client = ScoringClient(port=service.port)
+            return await asyncio.gather(*(client.score({"credit_score": 600 + i}) for i in range(20)))
+        finally:
+            await service.stop()
+
+    responses = _run(scenario())
+
+    assert [status for status, _ in responses] == [200] * 20
+    assert [body["Predicted_PD"] for _, body in responses] == [(600 + i) / 1000.0 for i in range(20)]
+    assert sum(system.batch_sizes) == 20
+    assert len(system.batch_sizes) < 20
+
+
+def test_bad_applicant_does_not_fail_batch():
+    """
+    An applicant missing fields gets a 422, the rest of its batch is still scored
+    """
+    system = DummySystem()
+
+    async def scenario():
+        service = ScoringService(system, port=0, max_wait_ms=50)
+        await service.start()
+        try:
+            client = ScoringClient(port=service.port)
+            return await asyncio.gather(
+                client.score({"credit_score": 700}),
+                client.score({"age": 30}),
+                client.request("GET", "/health"),
+                client.request("GET", "/nothing"),
+            )
+        finally:
+            await service.stop()
+
+    good, bad, health, missing = _run(scenario())
+
+    assert good == (200, {"Decision": "Approved", "Reasons": ["All criteria met"], "Predicted_PD": 0.7})
+    assert bad[0] == 422
+    assert health[0] == 200
+    assert missing[0] == 404
+
+
+def test_malformed_and_oversized_requests_are_rejected():
+    """
+    A bad request line or Content-Length gets a 400, a body over max_body_bytes a 413, without reading it
+    """
+    async def send(port, raw):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(raw)
+        await writer.drain()
+        response = await asyncio.wait_for(reader.read(), 5)
+        writer.close()
+        return int(response.split(b" ", 2)[1])
+
+    async def scenario():
+        service = ScoringService(DummySystem(), port=0, max_body_bytes=100)
+        await service.start()
+        try:
+            return await asyncio.gather(
+                send(service.port, b"GARBAGE\r\n\r\n"),
+                send(service.port, b"POST /score HTTP/1.1\r\nContent-Length: ten\r\n\r\n"),
+                send(service.port, b"POST /score HTTP/1.1\r\nContent-Length: -1\r\n\r\n"),
+                send(service.port, b"POST /score HTTP/1.1\r\nContent-Length: 1000000000\r\n\r\n"),
+                ScoringClient(port=service.port).score({"credit_score": 700}),
+            )
+        finally:
+            await service.stop()
+
+    *statuses, good = _run(scenario())
+
+    assert statuses == [400, 400, 400, 413]
+    assert good[0] == 200
+
+
+def test_service_with_real_system():
+    from descision_system import LoanDecisionSystem
+
+    system = LoanDecisionSystem()
+    data = pd.read_csv(PROJECT_ROOT / "data" / "loan_applications.csv", sep="\t").head(5)
+    applicants = data.drop(columns=["default_12m"]).to_dict("records")
+    applicants = [{k: (v.item() if hasattr(v, "item") else v) for k, v in a.items()} for a in applicants]
+
+    async def scenario():
+        service = ScoringService(system, port=0)
+        await service.start()
+        try:
+            return await ScoringClient(port=service.port).request("POST", "/score", {"applicants": applicants})
+        finally:
+            await service.stop()
+
+    status, body = _run(scenario())
+
+    assert status == 200
+    for applicant, result in zip(applicants, body["results"]):
+        expected = system.make_decision(applicant)
+        assert result["Decision"] == expected["Decision"]
+        assert result["Reasons"] == expected["Reasons"]
+        assert abs(result["Predicted_PD"] - expected["Predicted_PD"]) < 1e-12
+
+
+def test_incomplete_applicant_is_rejected_even_when_batched():
+    """
+    An applicant missing a feature gets a 422 whether it arrives alone or coalesced with a valid one
+    """
+    from descision_system import LoanDecisionSystem
+
+    system = LoanDecisionSystem()
+    data = pd.read_csv(PROJECT_ROOT / "data" / "loan_applications.csv", sep="\t").head(1)
+    valid = {k: (v.item() if hasattr(v, "item") else v) for k, v in data.drop(columns=["default_12m"]).iloc[0].items()}
+    incomplete = {k: v for k, v in valid.items() if k != "purpose"}
+
+    async def scenario():
+        service = ScoringService(system, port=0, max_wait_ms=50)
+        await service.start()
+        try:
+            client = ScoringClient(port=service.port)
+            alone = await client.score(incomplete)
+            together = await asyncio.gather(client.score(incomplete), client.score(valid))
+            return alone, together, service.batcher.batches_scored
+        finally:
+            await service.stop()
+
+    alone, (bad, good), batches = _run(scenario())
+
+    assert alone[0] == 422 and bad[0] == 422
+    assert good[0] == 200 and good[1]["Decision"] == system.make_decision(valid)["Decision"]
+    assert batches == 2
+
+
+def test_unexpected_scoring_error_is_a_500():
+    """
+    An error that isn't about the applicant (here a failing audit log) still gets a response
+    """
+    class FailingSystem(DummySystem):
+        def make_decisions(self, applicants):
+            raise RuntimeError("Audit log writer is not running")
+
+    async def scenario():
+        service = ScoringService(FailingSystem(), port=0)
+        await service.start()
+        try:
+            client = ScoringClient(port=service.port)
+            return await client.score({"credit_score": 700}), await client.request("GET", "/health")
+        finally:
+            await service.stop()
+
+    failed, health = _run(scenario())
+
+    assert failed == (500, {"error": "Scoring failed: Audit log writer is not running"})
+    assert health[0] == 200
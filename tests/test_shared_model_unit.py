@@ -0,0 +1,69 @@
+"""
+Unit tests for the memory-mapped shared model
+"""
+import sys
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = PROJECT_ROOT / "src"
+sys.path.append(str(SRC_DIR))
+
+from src.compiled_scorer import CompiledScorer  # noqa: E402
+from src.descision_system import LoanDecisionSystem  # noqa: E402
+from src.shared_model import SharedModel, publish  # noqa: E402
+
+
+@pytest.fixture
+def scorer_and_data():
+    pipeline = joblib.load(PROJECT_ROOT / "models" / "logistic_regression_model.joblib")
+    data = pd.read_csv(PROJECT_ROOT / "data" / "loan_applications.csv", sep="\t")
+    return CompiledScorer.from_pipeline(pipeline), data.drop(columns=["default_12m"])
+
+
+def test_attached_model_matches_scorer(tmp_path, scorer_and_data):
+    """
+    A published segment scores exactly like the scorer it came from, with the weights mapped read-only
+    """
+    scorer, data = scorer_and_data
+    version = publish(scorer, tmp_path)
+    shared = SharedModel(tmp_path)
+
+    assert shared.version == version
+    np.testing.assert_array_equal(shared.scorer.predict_pd_batch(data), scorer.predict_pd_batch(data))
+    row = data.iloc[0].to_dict()
+    assert shared.scorer.predict_pd(row) == scorer.predict_pd(row)
+    assert not shared.scorer.numeric_weights.flags.writeable
+
+
+def test_publish_swaps_model_atomically(tmp_path, scorer_and_data):
+    """
+    Publishing a new segment switches attached readers on refresh, and old segments are cleaned up
+    """
+    scorer, data = scorer_and_data
+    publish(scorer, tmp_path)
+    system = LoanDecisionSystem(str(tmp_path))
+    before = system.predict_pds(data)[1]
+
+    shifted = CompiledScorer(scorer.intercept + 1.0, scorer.numeric_features, scorer.numeric_weights,
+                             scorer.categorical_weights)
+    new_version = publish(shifted, tmp_path)
+    assert system.refresh_shared_model()
+    assert system.model_version == new_version
+    assert not system.refresh_shared_model()
+    assert (system.predict_pds(data)[1] > before).all()
+
+    publish(scorer, tmp_path, version="third")
+    assert len(list(tmp_path.glob("segment-*.bin"))) == 2
+
+
+def test_missing_segment_raises(tmp_path):
+    """
+    Attaching to a directory with nothing published is an error
+    """
+    with pytest.raises(FileNotFoundError):
+        SharedModel(tmp_path)